@@ -0,0 +1,215 @@
+import hashlib
+import json
+import os
+import shutil
+import threading
+from io import BytesIO
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from ingestao import COLUNAS_QUARENTENA, TAMANHO_BLOCO, juntar_quarentena, ler_em_blocos
+from normalizacao import COLUNAS_VENDAS, TIPO_MES
+
+
+DIRETORIO_ARMAZEM = "snapshot_vendas"
+MAXIMO_PARTES = 32
+
+# 🧱 Esquema gravado no Parquet (categóricos viram texto; ANO fica no nome da partição)
+ESQUEMA = pa.schema([
+    ("REP.", pa.string()),
+    ("SUBTOTAL", pa.float64()),
+    ("MÊS", pa.string()),
+    ("EMPRESA", pa.string()),
+])
+
+
+def _hash(conteudo):
+    return hashlib.sha256(conteudo).hexdigest()
+
+
+def _tabela(vendas):
+    return pa.Table.from_pandas(
+        vendas[ESQUEMA.names].astype(object).reset_index(drop=True), schema=ESQUEMA, preserve_index=False
+    )
+
+
+# 🗄️ Snapshot local das vendas já limpas: Parquet particionado por ANO, lido com memory map
+class ArmazemVendas:
+    def __init__(self, diretorio=DIRETORIO_ARMAZEM, tamanho_bloco=TAMANHO_BLOCO):
+        self.diretorio = diretorio
+        self.tamanho_bloco = tamanho_bloco
+        self.linhas_interpretadas = 0
+        self._lock = threading.RLock()
+        self._dados = None
+        self._manifesto = self._ler_manifesto()
+
+    @property
+    def _caminho_dados(self):
+        return os.path.join(self.diretorio, "dados")
+
+    @property
+    def _caminho_manifesto(self):
+        return os.path.join(self.diretorio, "manifesto.json")
+
+    @property
+    def _caminho_quarentena(self):
+        return os.path.join(self.diretorio, "quarentena.parquet")
+
+    # 🚫 Linhas da planilha que não puderam ser interpretadas (valor, mês ou ano inválidos)
+    @property
+    def quarentena(self):
+        try:
+            return pd.read_parquet(self._caminho_quarentena)
+        except FileNotFoundError:
+            return pd.DataFrame(columns=COLUNAS_QUARENTENA)
+
+    # 🔢 Hash do CSV que originou o snapshot (mesmo valor do hash_conteudo do carregador)
+    @property
+    def versao(self):
+        return self._manifesto["versao"] if self._manifesto else None
+
+    def _ler_manifesto(self):
+        try:
+            with open(self._caminho_manifesto, encoding="utf-8") as arquivo:
+                return json.load(arquivo)
+        except FileNotFoundError:
+            return None
+
+    def _gravar_manifesto(self, manifesto):
+        temporario = self._caminho_manifesto + ".tmp"
+        with open(temporario, "w", encoding="utf-8") as arquivo:
+            json.dump(manifesto, arquivo, ensure_ascii=False)
+        os.replace(temporario, self._caminho_manifesto)
+        self._manifesto = manifesto
+        self._dados = None
+
+    # 📥 Recebe o CSV inteiro da aba VENDAS e interpreta só o que foi acrescentado desde o último snapshot
+    def ingerir(self, arquivo):
+        conteudo = arquivo.read() if hasattr(arquivo, "read") else arquivo
+        with self._lock:
+            manifesto = self._manifesto
+            versao = _hash(conteudo)
+            if manifesto is not None and manifesto["versao"] == versao:
+                return self.carregar()
+            if manifesto is not None and self._so_acrescimo(manifesto, conteudo):
+                self._acrescentar(manifesto, conteudo, versao)
+            else:
+                self._reconstruir(conteudo, versao)
+            return self.carregar()
+
+    # ✂️ O prefixo já gravado continua idêntico e o restante começa numa nova linha?
+    def _so_acrescimo(self, manifesto, conteudo):
+        consumidos = manifesto["bytes"]
+        if "linhas_csv" not in manifesto or len(conteudo) <= consumidos or _hash(conteudo[:consumidos]) != manifesto["versao"]:
+            return False
+        return conteudo[consumidos - 1:consumidos] == b"\n" or conteudo[consumidos:consumidos + 1] in (b"\n", b"\r")
+
+    # 🌊 Interpreta o CSV bloco a bloco, gravando cada bloco direto no Parquet (memória limitada ao bloco)
+    def _interpretar(self, conteudo, destino, lote, deslocamento=0):
+        escritores = {}
+        quarentenas = []
+        lidas = validas = 0
+        try:
+            for bloco in ler_em_blocos(BytesIO(conteudo), self.tamanho_bloco, deslocamento):
+                lidas += bloco.linhas_lidas
+                validas += len(bloco.vendas)
+                quarentenas.append(bloco.quarentena)
+                for ano, grupo in bloco.vendas.groupby("ANO", sort=True):
+                    if ano not in escritores:
+                        particao = os.path.join(destino, f"ANO={int(ano)}")
+                        os.makedirs(particao, exist_ok=True)
+                        escritores[ano] = pq.ParquetWriter(os.path.join(particao, f"parte-{lote:05d}.parquet"), ESQUEMA)
+                    escritores[ano].write_table(_tabela(grupo))
+        finally:
+            for escritor in escritores.values():
+                escritor.close()
+        self.linhas_interpretadas += validas
+        return lidas, validas, juntar_quarentena(quarentenas)
+
+    def _gravar_quarentena(self, quarentena):
+        quarentena.astype({"LINHA": "int64"}).to_parquet(self._caminho_quarentena, index=False)
+
+    def _acrescentar(self, manifesto, conteudo, versao):
+        cabecalho = conteudo[:conteudo.index(b"\n") + 1]
+        lote = manifesto["lotes"]
+        lidas, validas, quarentena = self._interpretar(
+            cabecalho + conteudo[manifesto["bytes"]:].lstrip(b"\r\n"),
+            self._caminho_dados, lote, manifesto["linhas_csv"],
+        )
+        if not quarentena.empty:
+            self._gravar_quarentena(juntar_quarentena([self.quarentena, quarentena]))
+        self._gravar_manifesto({
+            "versao": versao,
+            "bytes": len(conteudo),
+            "lotes": lote + 1,
+            "linhas": manifesto["linhas"] + validas,
+            "linhas_csv": manifesto["linhas_csv"] + lidas,
+        })
+        if any(len(os.listdir(os.path.join(self._caminho_dados, particao))) > MAXIMO_PARTES
+               for particao in os.listdir(self._caminho_dados)):
+            self.compactar()
+
+    def _reconstruir(self, conteudo, versao):
+        lidas, validas, quarentena = self._trocar_dados(lambda destino: self._interpretar(conteudo, destino, 0))
+        self._gravar_quarentena(quarentena)
+        self._gravar_manifesto({
+            "versao": versao,
+            "bytes": len(conteudo),
+            "lotes": 1,
+            "linhas": validas,
+            "linhas_csv": lidas,
+        })
+
+    # 🔁 Grava num diretório novo e troca de uma vez (leitores com memory map continuam válidos)
+    def _trocar_dados(self, escrever):
+        novo = os.path.join(self.diretorio, ".dados-novo")
+        antigo = os.path.join(self.diretorio, ".dados-antigo")
+        for caminho in (novo, antigo):
+            shutil.rmtree(caminho, ignore_errors=True)
+        os.makedirs(novo)
+        resultado = escrever(novo)
+        if os.path.exists(self._caminho_dados):
+            os.replace(self._caminho_dados, antigo)
+        os.replace(novo, self._caminho_dados)
+        shutil.rmtree(antigo, ignore_errors=True)
+        return resultado
+
+    def _escrever_partes(self, destino, vendas, lote):
+        for ano, grupo in vendas.groupby("ANO", sort=True):
+            particao = os.path.join(destino, f"ANO={int(ano)}")
+            os.makedirs(particao, exist_ok=True)
+            pq.write_table(_tabela(grupo), os.path.join(particao, f"parte-{lote:05d}.parquet"))
+
+    # 🧹 Junta as partes pequenas de cada ano em um único arquivo
+    def compactar(self):
+        with self._lock:
+            atual = self._ler_dados()
+            self._trocar_dados(lambda destino: self._escrever_partes(destino, atual, 0))
+            self._gravar_manifesto({**self._manifesto, "lotes": 1})
+
+    def _ler_dados(self):
+        if not os.path.isdir(self._caminho_dados) or not os.listdir(self._caminho_dados):
+            return pd.DataFrame({
+                "REP.": pd.Series(dtype="category"),
+                "SUBTOTAL": pd.Series(dtype="float64"),
+                "MÊS": pd.Series(dtype=TIPO_MES),
+                "EMPRESA": pd.Series(dtype="category"),
+                "ANO": pd.Series(dtype="int16"),
+            })
+        tabela = pq.read_table(self._caminho_dados, partitioning="hive", memory_map=True)
+        df = tabela.to_pandas(self_destruct=True)
+        return pd.DataFrame({
+            "REP.": df["REP."].astype("category"),
+            "SUBTOTAL": df["SUBTOTAL"],
+            "MÊS": df["MÊS"].astype(TIPO_MES),
+            "EMPRESA": df["EMPRESA"].astype("category"),
+            "ANO": df["ANO"].astype("int16"),
+        })[COLUNAS_VENDAS]
+
+    # 📖 Uma única cópia somente leitura por versão, compartilhada por quem chamar
+    def carregar(self):
+        if self._dados is None:
+            self._dados = self._ler_dados()
+        return self._dados
@@ -0,0 +1,245 @@
+import argparse
+import json
+import os
+import platform
+import resource
+import statistics
+import subprocess
+import sys
+import time
+import tracemalloc
+from datetime import datetime
+from io import BytesIO
+
+import pandas as pd
+import pyarrow as pa
+
+import cubo as cubo_vendas
+from exportacao import Aba, gerar_excel, gerar_relatorio_completo
+from formatacao import formatar_brl, tabela_exibicao
+from ingestao import ingerir
+from motor_ranking import adicionar_totais, classificar_tudo, pontos_por_posicao
+from normalizacao import normalizar_pontos, normalizar_vendas
+from paginacao import paginar
+from pontos import aplicar_pontos_extras
+from sinteticos import gerar_pontos, gerar_vendas, para_csv
+
+
+TAMANHOS_PADRAO = (10_000, 100_000, 1_000_000)
+
+
+# 🧩 Etapas do pipeline, na ordem em que o app as executa; cada uma lê e grava no contexto
+def _parse(ctx):
+    ctx["bruto"] = pd.read_csv(BytesIO(ctx["csv_vendas"]))
+    ctx["pontos_bruto"] = pd.read_csv(BytesIO(ctx["csv_pontos"]))
+    return len(ctx["bruto"])
+
+
+def _limpeza(ctx):
+    ctx["vendas"] = normalizar_vendas(ctx["bruto"])
+    ctx["pontos"] = normalizar_pontos(ctx["pontos_bruto"])
+    return len(ctx["vendas"])
+
+
+def _ingestao_blocos(ctx):
+    return ingerir(BytesIO(ctx["csv_vendas"])).linhas_validas
+
+
+def _pivot(ctx):
+    ctx["cubo"] = cubo_vendas.construir_cubo(ctx["vendas"])
+    ctx["ano"] = cubo_vendas.anos(ctx["cubo"])[-1]
+    ctx["tabela_vendas"] = cubo_vendas.tabela_vendas_geral(ctx["cubo"], ctx["ano"])
+    return len(ctx["cubo"])
+
+
+def _ranking(ctx):
+    ranking = cubo_vendas.vendas_por_rep(ctx["cubo"], ctx["ano"]).reset_index()
+    ranking["PONTOS"] = pontos_por_posicao(ranking["SUBTOTAL"])
+    ctx["ranking"] = ranking
+    return len(ranking)
+
+
+def _pontos_extras(ctx):
+    ranking = aplicar_pontos_extras(ctx["ranking"], ctx["pontos"], ausentes="incluir")
+    ranking["TOTAL DE PONTOS"] = ranking[["PONTOS", "AÇÃO", "PROMOÇÃO", "INADIMPLÊNCIA"]].sum(axis=1)
+    ctx["classificacao"] = adicionar_totais(ranking, cubo_vendas.total_vendas(ctx["cubo"], ctx["ano"]))
+    return len(ctx["classificacao"])
+
+
+def _rankings_todos(ctx):
+    return len(classificar_tudo(ctx["cubo"], ctx["pontos"]))
+
+
+def _formatacao(ctx):
+    tabela = ctx["tabela_vendas"]
+    tabela_exibicao(tabela, list(tabela.columns))
+    tabela_exibicao(ctx["classificacao"], ["SUBTOTAL"])
+    return tabela.size + len(ctx["classificacao"])
+
+
+# 📄 Só a página visível (+ linha de total), como o app exibe: não cresce com o número de reps
+def _formatacao_pagina(ctx):
+    tabela = paginar(ctx["tabela_vendas"], fixas=["TOTAL POR MÊS"]).dados
+    ranking = paginar(ctx["classificacao"], coluna="REP.", fixas=["TOTAL GERAL"]).dados
+    tabela_exibicao(tabela, list(tabela.columns))
+    tabela_exibicao(ranking, ["SUBTOTAL"])
+    return tabela.size + len(ranking)
+
+
+def _formatacao_coluna(ctx):
+    return len(formatar_brl(ctx["vendas"]["SUBTOTAL"]))
+
+
+def _abas(ctx):
+    tabela = ctx["tabela_vendas"].rename_axis("REP.")
+    return [
+        Aba("Vendas por Mês", tabela, tuple(tabela.columns), index=True),
+        Aba("Classificação Geral", ctx["classificacao"], ("SUBTOTAL",)),
+        Aba("Pontos Extras", ctx["pontos"]),
+    ]
+
+
+def _excel(ctx):
+    return len(gerar_excel(_abas(ctx)))
+
+
+def _relatorio(ctx):
+    return len(gerar_relatorio_completo(_abas(ctx)))
+
+
+ETAPAS = {
+    "parse": _parse,
+    "limpeza": _limpeza,
+    "ingestao_blocos": _ingestao_blocos,
+    "pivot": _pivot,
+    "ranking": _ranking,
+    "pontos_extras": _pontos_extras,
+    "rankings_todos": _rankings_todos,
+    "formatacao": _formatacao,
+    "formatacao_pagina": _formatacao_pagina,
+    "formatacao_coluna": _formatacao_coluna,
+    "excel": _excel,
+    "relatorio": _relatorio,
+}
+
+
+# ⏱️ Roda o pipeline inteiro `repeticoes` vezes medindo cada etapa; depois uma passada com tracemalloc para o pico
+def medir(linhas, repeticoes=3, memoria=True, semente=0):
+    base = {
+        "csv_vendas": para_csv(gerar_vendas(linhas, semente=semente)),
+        "csv_pontos": para_csv(gerar_pontos(max(linhas // 100, 10), semente=semente)),
+    }
+    tempos = {nome: [] for nome in ETAPAS}
+    saidas = {}
+    for _ in range(repeticoes):
+        ctx = dict(base)
+        for nome, etapa in ETAPAS.items():
+            inicio = time.perf_counter()
+            saidas[nome] = etapa(ctx)
+            tempos[nome].append(time.perf_counter() - inicio)
+
+    picos = {}
+    if memoria:
+        ctx = dict(base)
+        tracemalloc.start()
+        try:
+            for nome, etapa in ETAPAS.items():
+                tracemalloc.reset_peak()
+                antes = tracemalloc.get_traced_memory()[0]
+                etapa(ctx)
+                picos[nome] = (tracemalloc.get_traced_memory()[1] - antes) / 2**20
+        finally:
+            tracemalloc.stop()
+
+    return {
+        "linhas": linhas,
+        "bytes_csv": len(base["csv_vendas"]),
+        "etapas": {
+            nome: {
+                "segundos": min(tempos[nome]),
+                "mediana": statistics.median(tempos[nome]),
+                "pico_mb": picos.get(nome),
+                "saida": saidas[nome],
+            }
+            for nome in ETAPAS
+        },
+    }
+
+
+def _commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True,
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def relatorio(tamanhos=TAMANHOS_PADRAO, repeticoes=3, memoria=True):
+    resultados = [medir(linhas, repeticoes, memoria) for linhas in tamanhos]
+    return {
+        "commit": _commit(),
+        "gerado_em": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "pandas": pd.__version__,
+        "pyarrow": pa.__version__,
+        "repeticoes": repeticoes,
+        "resultados": resultados,
+        "pico_processo_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+        "pico_arrow_mb": pa.default_memory_pool().max_memory() / 2**20,
+    }
+
+
+# 🔍 Razão atual/anterior por etapa e tamanho (> 1 = ficou mais lento)
+def comparar(atual, anterior):
+    anteriores = {r["linhas"]: r["etapas"] for r in anterior["resultados"]}
+    comparacao = {}
+    for resultado in atual["resultados"]:
+        etapas_antes = anteriores.get(resultado["linhas"])
+        if etapas_antes is None:
+            continue
+        comparacao[resultado["linhas"]] = {
+            nome: medida["segundos"] / etapas_antes[nome]["segundos"]
+            for nome, medida in resultado["etapas"].items()
+            if nome in etapas_antes and etapas_antes[nome]["segundos"]
+        }
+    return comparacao
+
+
+def _imprimir(rel, comparacao=None):
+    for resultado in rel["resultados"]:
+        print(f"\n📏 {resultado['linhas']:,} linhas ({resultado['bytes_csv'] / 2**20:.1f} MB de CSV)")
+        razoes = (comparacao or {}).get(resultado["linhas"], {})
+        for nome, medida in resultado["etapas"].items():
+            pico = f"{medida['pico_mb']:9.1f} MB" if medida["pico_mb"] is not None else ""
+            razao = f"  x{razoes[nome]:.2f}" if nome in razoes else ""
+            print(f"  {nome:<18} {medida['segundos'] * 1000:10.1f} ms {pico}{razao}")
+
+
+# 🖥️ Linha de comando: python benchmark.py --linhas 10000 1000000 --saida benchmark.json
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Mede cada etapa do pipeline de ranking com dados sintéticos.")
+    parser.add_argument("--linhas", type=int, nargs="+", default=list(TAMANHOS_PADRAO), help="Tamanhos da aba VENDAS")
+    parser.add_argument("--repeticoes", type=int, default=3, help="Execuções por tamanho (vale a mais rápida)")
+    parser.add_argument("--sem-memoria", action="store_true", help="Não mede o pico de memória (tracemalloc)")
+    parser.add_argument("--saida", help="Arquivo JSON com o relatório")
+    parser.add_argument("--comparar", help="Relatório JSON anterior para comparar etapa a etapa")
+    args = parser.parse_args(argv)
+
+    rel = relatorio(args.linhas, args.repeticoes, not args.sem_memoria)
+    comparacao = None
+    if args.comparar:
+        with open(args.comparar, encoding="utf-8") as arquivo:
+            comparacao = comparar(rel, json.load(arquivo))
+        rel["comparacao"] = {str(linhas): razoes for linhas, razoes in comparacao.items()}
+    _imprimir(rel, comparacao)
+    if args.saida:
+        with open(args.saida, "w", encoding="utf-8") as arquivo:
+            json.dump(rel, arquivo, ensure_ascii=False, indent=2)
+        print(f"\n✅ Relatório gravado em {args.saida}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,141 @@
+import hashlib
+import threading
+import time
+import urllib.error
+import urllib.request
+from dataclasses import dataclass, replace
+from io import BytesIO
+from typing import Callable, Optional
+
+import pandas as pd
+
+
+# 🔗 URLs das abas da planilha do Google Sheets
+SHEET_ID = "1n4C3ideu-g-xzVBJIdkyPo-8ewGH3wU1"
+TIMEOUT = 30
+
+
+def url_aba(nome_aba, sheet_id=SHEET_ID):
+    return f"https://docs.google.com/spreadsheets/d/{sheet_id}/gviz/tq?tqx=out:csv&sheet={nome_aba}"
+
+
+# 📦 Última versão boa de uma aba
+@dataclass(frozen=True)
+class Snapshot:
+    dados: pd.DataFrame
+    hash_conteudo: str
+    etag: Optional[str]
+    last_modified: Optional[str]
+    carregado_em: float
+    verificado_em: float
+
+    def idade(self, agora=None):
+        return (agora if agora is not None else time.time()) - self.verificado_em
+
+
+# 📡 Carregador de uma aba com TTL, requisição condicional e atualização em segundo plano
+class CarregadorPlanilha:
+    def __init__(
+        self,
+        url: str,
+        ttl: float = 300,
+        timeout: float = TIMEOUT,
+        parser: Callable[[BytesIO], pd.DataFrame] = pd.read_csv,
+    ):
+        self.url = url
+        self.ttl = ttl
+        self.timeout = timeout
+        self.parser = parser
+        self.snapshot: Optional[Snapshot] = None
+        self.ultimo_erro: Optional[Exception] = None
+        self.requisicoes = 0
+        self.parses = 0
+        self._lock = threading.Lock()
+        self._lock_thread = threading.Lock()
+        self._atualizando: Optional[threading.Thread] = None
+
+    # 🚦 Retorna o snapshot atual, buscando na rede só quando necessário
+    def obter(self, forcar=False, stale_while_revalidate=False) -> Snapshot:
+        snapshot = self.snapshot
+        if snapshot is not None and not forcar:
+            if snapshot.idade() < self.ttl:
+                return snapshot
+            if stale_while_revalidate:
+                self.atualizar_em_segundo_plano()
+                return snapshot
+        with self._lock:
+            # Outra sessão pode ter atualizado enquanto esperávamos o lock
+            if not forcar and self.snapshot is not None and self.snapshot is not snapshot \
+                    and self.snapshot.idade() < self.ttl:
+                return self.snapshot
+            return self._atualizar(forcar)
+
+    def atualizar_em_segundo_plano(self):
+        with self._lock_thread:
+            if self._atualizando is not None and self._atualizando.is_alive():
+                return self._atualizando
+            thread = threading.Thread(target=self._atualizar_seguro, daemon=True)
+            self._atualizando = thread
+            thread.start()
+            return thread
+
+    def _atualizar_seguro(self):
+        try:
+            with self._lock:
+                self._atualizar(forcar=False)
+        except Exception:
+            # Erro de rede ou de leitura já registrado em ultimo_erro; o último snapshot bom continua sendo servido
+            pass
+
+    def _atualizar(self, forcar) -> Snapshot:
+        anterior = self.snapshot
+        requisicao = urllib.request.Request(self.url)
+        if anterior is not None and not forcar:
+            if anterior.etag:
+                requisicao.add_header("If-None-Match", anterior.etag)
+            if anterior.last_modified:
+                requisicao.add_header("If-Modified-Since", anterior.last_modified)
+
+        agora = time.time()
+        self.requisicoes += 1
+        try:
+            with urllib.request.urlopen(requisicao, timeout=self.timeout) as resposta:
+                conteudo = resposta.read()
+                etag = resposta.headers.get("ETag")
+                last_modified = resposta.headers.get("Last-Modified")
+        except urllib.error.HTTPError as e:
+            if e.code == 304 and anterior is not None:
+                self.ultimo_erro = None
+                self.snapshot = replace(anterior, verificado_em=agora)
+                return self.snapshot
+            self.ultimo_erro = e
+            raise
+        except Exception as e:
+            self.ultimo_erro = e
+            raise
+
+        hash_conteudo = hashlib.sha256(conteudo).hexdigest()
+        if anterior is not None and not forcar and anterior.hash_conteudo == hash_conteudo:
+            # Conteúdo idêntico: reaproveita o DataFrame já interpretado
+            dados = anterior.dados
+            carregado_em = anterior.carregado_em
+        else:
+            try:
+                dados = self.parser(BytesIO(conteudo))
+            except Exception as e:
+                # Planilha mudou de formato: o erro fica visível e o último snapshot bom continua valendo
+                self.ultimo_erro = e
+                raise
+            self.parses += 1
+            carregado_em = agora
+
+        self.ultimo_erro = None
+        self.snapshot = Snapshot(
+            dados=dados,
+            hash_conteudo=hash_conteudo,
+            etag=etag,
+            last_modified=last_modified,
+            carregado_em=carregado_em,
+            verificado_em=agora,
+        )
+        return self.snapshot
@@ -0,0 +1,74 @@
+import pandas as pd
+
+from normalizacao import ABREVIACOES, abreviar_meses
+
+
+DIMENSOES = ["ANO", "EMPRESA", "REP.", "MÊS"]
+
+
+# 🧊 Soma de SUBTOTAL por ANO × EMPRESA × REP. × MÊS (uma linha por combinação com venda)
+def construir_cubo(vendas):
+    return (
+        vendas.groupby(DIMENSOES, observed=True, dropna=False, sort=True)["SUBTOTAL"]
+        .sum()
+        .reset_index()
+    )
+
+
+# 🔪 Recorte do cubo pelos mesmos filtros das páginas
+def fatiar(cubo, ano=None, empresa=None, meses=None):
+    mascara = pd.Series(True, index=cubo.index)
+    if ano is not None:
+        mascara &= cubo["ANO"] == ano
+    if empresa is not None and empresa != "Todas":
+        mascara &= cubo["EMPRESA"] == empresa
+    if meses:
+        mascara &= cubo["MÊS"].isin(meses)
+    return cubo[mascara]
+
+
+def anos(cubo):
+    return sorted(cubo["ANO"].unique().tolist())
+
+
+def empresas(cubo):
+    return sorted(cubo["EMPRESA"].dropna().unique().tolist())
+
+
+def meses(cubo):
+    return cubo["MÊS"].dropna().cat.remove_unused_categories().cat.categories.tolist()
+
+
+# 📋 Tabela REP. × MÊS (abreviado) com todos os meses do ano
+def tabela_rep_mes(cubo, ano):
+    fatia = fatiar(cubo, ano=ano)
+    tabela = (
+        fatia.assign(**{"MÊS": abreviar_meses(fatia["MÊS"])})
+        .groupby(["REP.", "MÊS"], observed=True)["SUBTOTAL"]
+        .sum()
+        .unstack("MÊS", fill_value=0)
+    )
+    tabela.index = tabela.index.astype(str)
+    tabela.columns = tabela.columns.astype(str)
+    tabela.columns.name = "MÊS"
+    return tabela.reindex(columns=ABREVIACOES, fill_value=0)
+
+
+# 📊 Tabela da Venda Geral: coluna TOTAL GERAL, reps do maior para o menor e linha TOTAL POR MÊS
+def tabela_vendas_geral(cubo, ano):
+    tabela = tabela_rep_mes(cubo, ano)
+    tabela["TOTAL GERAL"] = tabela.sum(axis=1)
+    linha_total = tabela.sum(axis=0).to_frame("TOTAL POR MÊS").T
+    tabela_ordenada = tabela.sort_values(by="TOTAL GERAL", ascending=False)
+    return pd.concat([tabela_ordenada, linha_total])
+
+
+# 🏆 Total de vendas por representante, do maior para o menor
+def vendas_por_rep(cubo, ano=None, empresa=None, meses=None):
+    vendas = fatiar(cubo, ano, empresa, meses).groupby("REP.", observed=True)["SUBTOTAL"].sum()
+    vendas.index = vendas.index.astype(str)
+    return vendas.sort_values(ascending=False)
+
+
+def total_vendas(cubo, ano=None, empresa=None, meses=None):
+    return fatiar(cubo, ano, empresa, meses)["SUBTOTAL"].sum()
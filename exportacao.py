@@ -0,0 +1,68 @@
+from dataclasses import dataclass
+from io import BytesIO
+
+import pandas as pd
+import xlsxwriter
+
+from formatacao import FORMATO_EXCEL_BRL, FORMATO_EXCEL_PERCENTUAL, escrever_excel
+
+
+MIME_XLSX = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+
+
+# 📄 Uma aba de planilha: dados numéricos + colunas que recebem formato de moeda/percentual
+@dataclass(frozen=True)
+class Aba:
+    nome: str
+    dados: pd.DataFrame
+    colunas_brl: tuple = ()
+    colunas_percentual: tuple = ()
+    index: bool = False
+
+
+# 📤 Planilha pequena (histórico de pontos, classificação) via pandas + xlsxwriter
+def gerar_excel(abas):
+    buffer = BytesIO()
+    with pd.ExcelWriter(buffer, engine="xlsxwriter") as writer:
+        for aba in abas:
+            escrever_excel(writer, aba.dados, aba.nome, aba.colunas_brl, aba.colunas_percentual, aba.index)
+    return buffer.getvalue()
+
+
+def _valor_celula(valor):
+    if valor is None or (isinstance(valor, float) and valor != valor):
+        return None
+    if isinstance(valor, pd.Timestamp):
+        return valor.to_pydatetime(warn=False)
+    return valor
+
+
+# 📚 Relatório com várias abas escrito linha a linha em modo de memória constante
+def gerar_relatorio_completo(abas):
+    buffer = BytesIO()
+    pasta = xlsxwriter.Workbook(buffer, {
+        "constant_memory": True,
+        "default_date_format": "dd/mm/yyyy hh:mm",
+    })
+    negrito = pasta.add_format({"bold": True})
+    formatos = {
+        "brl": pasta.add_format({"num_format": FORMATO_EXCEL_BRL}),
+        "percentual": pasta.add_format({"num_format": FORMATO_EXCEL_PERCENTUAL}),
+    }
+
+    for aba in abas:
+        dados = aba.dados.reset_index() if aba.index else aba.dados
+        planilha = pasta.add_worksheet(aba.nome[:31])
+        colunas = [str(coluna) for coluna in dados.columns]
+        for tipo, nomes in (("brl", aba.colunas_brl), ("percentual", aba.colunas_percentual)):
+            for nome in nomes:
+                posicao = colunas.index(str(nome))
+                planilha.set_column(posicao, posicao, 18, formatos[tipo])
+
+        # No modo de memória constante cada linha precisa ser escrita em ordem, uma única vez
+        planilha.write_row(0, 0, colunas, negrito)
+        for numero, linha in enumerate(dados.itertuples(index=False, name=None), start=1):
+            planilha.write_row(numero, 0, [_valor_celula(valor) for valor in linha])
+
+    pasta.close()
+    return buffer.getvalue()
@@ -0,0 +1,105 @@
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+
+
+# 💰 Formatos numéricos usados nas exportações para Excel
+FORMATO_EXCEL_BRL = '"R$" #,##0.00'
+FORMATO_EXCEL_PERCENTUAL = '0.00"%"'
+
+# 🧩 Pedaços pré-montados: cada valor vira uma junção de "takes" nessas tabelas (tudo em C++ no Arrow)
+# Grupos de milhar: índice 0-999 -> "", 1000-1999 -> "7", 2000-2999 -> ".007"
+_GRUPOS = pa.array([""] * 1000 + [str(i) for i in range(1000)] + [f".{i:03d}" for i in range(1000)])
+_CENTAVOS_BRL = pa.array([f",{i:02d}" for i in range(100)])
+_CENTAVOS_PERCENTUAL = pa.array([f".{i:02d}%" for i in range(100)])
+
+
+# 🔢 Arredonda para centavos exatamente como format(x, ".2f")
+def _centavos(valores):
+    escalado = valores * 100
+    centavos = np.rint(escalado)
+    # Quando x * 100 cai em ,5 o erro binário de x decide o lado; nesses raros casos usa o format do Python
+    empate = np.abs(np.abs(escalado - np.trunc(escalado)) - 0.5) < 1e-6
+    if empate.any():
+        centavos[empate] = [round(float(f"{v:.2f}") * 100) for v in valores[empate]]
+    return np.abs(centavos).astype(np.int64)
+
+
+def _indices(valores, nulos):
+    return pa.array(valores, mask=nulos)
+
+
+def _partes(serie):
+    valores = serie.to_numpy(dtype="float64", na_value=np.nan)
+    nulos = np.isnan(valores)
+    valores = np.where(nulos, 0.0, valores)
+    return nulos, np.signbit(valores).astype(np.int8), _centavos(valores)
+
+
+# 🔢 Parte inteira com separador de milhar: um pedaço por grupo de 3 dígitos
+def _grupos_milhar(inteiros, nulos):
+    maior = int(inteiros.max()) if len(inteiros) else 0
+    quantidade = 1
+    while 1000 ** quantidade <= maior:
+        quantidade += 1
+    pecas = []
+    for k in reversed(range(quantidade)):
+        grupo = (inteiros // 1000 ** k) % 1000
+        estado = np.where(inteiros >= 1000 ** (k + 1), 2, np.where(inteiros >= 1000 ** k, 1, 0))
+        if k == 0:
+            estado = np.maximum(estado, 1)
+        pecas.append(pc.take(_GRUPOS, _indices(grupo + 1000 * estado, nulos)))
+    return pecas
+
+
+def _serie(array, indice):
+    return pd.Series(pd.arrays.ArrowStringArray(array), index=indice)
+
+
+# 💰 Coluna inteira em reais: 1234.5 -> "R$ 1.234,50" (sem depender de locale)
+def formatar_brl(serie):
+    nulos, negativos, centavos = _partes(serie)
+    sinal = pc.take(pa.array(["R$ ", "R$ -"]), _indices(negativos, nulos))
+    resultado = pc.binary_join_element_wise(
+        sinal,
+        *_grupos_milhar(centavos // 100, nulos),
+        pc.take(_CENTAVOS_BRL, _indices(centavos % 100, nulos)),
+        "",
+    )
+    return _serie(resultado, serie.index)
+
+
+# 📈 Coluna inteira em percentual: -8.0487 -> "-8.05%"
+def formatar_percentual(serie):
+    nulos, negativos, centavos = _partes(serie)
+    resultado = pc.binary_join_element_wise(
+        pc.take(pa.array(["", "-"]), _indices(negativos, nulos)),
+        pc.cast(_indices(centavos // 100, nulos), pa.string()),
+        pc.take(_CENTAVOS_PERCENTUAL, _indices(centavos % 100, nulos)),
+        "",
+    )
+    return _serie(resultado, serie.index)
+
+
+# 🖼️ Cópia só para exibição: o DataFrame original continua numérico
+def tabela_exibicao(df, colunas_brl=(), colunas_percentual=()):
+    exibicao = df.copy()
+    for coluna in colunas_brl:
+        exibicao[coluna] = formatar_brl(df[coluna])
+    for coluna in colunas_percentual:
+        exibicao[coluna] = formatar_percentual(df[coluna])
+    return exibicao
+
+
+# 📤 Grava um DataFrame numérico no Excel com formato de moeda/percentual por coluna
+def escrever_excel(writer, df, nome_aba, colunas_brl=(), colunas_percentual=(), index=False):
+    df.to_excel(writer, index=index, sheet_name=nome_aba)
+    planilha = writer.sheets[nome_aba]
+    deslocamento = df.index.nlevels if index else 0
+    formatos = [(colunas_brl, FORMATO_EXCEL_BRL), (colunas_percentual, FORMATO_EXCEL_PERCENTUAL)]
+    for colunas, formato in formatos:
+        estilo = writer.book.add_format({"num_format": formato})
+        for coluna in colunas:
+            posicao = df.columns.get_loc(coluna) + deslocamento
+            planilha.set_column(posicao, posicao, 18, estilo)
@@ -0,0 +1,113 @@
+from dataclasses import dataclass
+
+import pandas as pd
+
+from cubo import construir_cubo
+from normalizacao import COLUNAS_VENDAS, converter_vendas, filtrar_vendas
+
+
+TAMANHO_BLOCO = 100_000
+LIMITE_QUARENTENA = 10_000
+
+# 📐 Esquema explícito da aba VENDAS: só essas colunas, tudo lido como texto e convertido na limpeza
+TIPOS_VENDAS = {coluna: str for coluna in COLUNAS_VENDAS}
+COLUNAS_QUARENTENA = ["LINHA", "MOTIVO", *COLUNAS_VENDAS]
+
+
+# 🧱 A planilha não tem as colunas que o app usa (layout mudou)
+class ErroEsquema(ValueError):
+    pass
+
+
+# 📦 Um bloco do CSV já limpo + as linhas que foram para a quarentena
+@dataclass(frozen=True)
+class Bloco:
+    vendas: pd.DataFrame
+    quarentena: pd.DataFrame
+    linhas_lidas: int
+
+
+# 📊 Resultado da ingestão em streaming: só o cubo agregado fica em memória, nunca as linhas
+@dataclass(frozen=True)
+class Ingestao:
+    cubo: pd.DataFrame
+    quarentena: pd.DataFrame
+    linhas_lidas: int
+    linhas_validas: int
+    linhas_quarentena: int
+
+
+def _preenchido(serie):
+    return serie.notna() & (serie.str.strip() != "")
+
+
+# 🚫 Linhas com valor, mês ou ano que não dá para interpretar (vazios e zeros continuam sendo só descartados)
+def separar_quarentena(bruto, convertido, deslocamento=0):
+    motivos = [
+        ("valor inválido", _preenchido(bruto["SUBTOTAL"]) & convertido["SUBTOTAL"].isna()),
+        ("mês desconhecido", _preenchido(bruto["MÊS"]) & convertido["MÊS"].isna()),
+        ("ano inválido", _preenchido(bruto["ANO"]) & convertido["ANO"].isna()),
+    ]
+    motivo = pd.Series(pd.NA, index=bruto.index, dtype="object")
+    for nome, mascara in reversed(motivos):
+        motivo = motivo.mask(mascara, nome)
+    ruins = motivo.notna()
+    quarentena = bruto[ruins].copy()
+    quarentena.insert(0, "MOTIVO", motivo[ruins])
+    # Número da linha na planilha: a 1 é o cabeçalho e o índice dos blocos continua de um bloco para o outro
+    quarentena.insert(0, "LINHA", bruto.index[ruins] + 2 + deslocamento)
+    return quarentena[COLUNAS_QUARENTENA].reset_index(drop=True), ~ruins
+
+
+# 🌊 Lê o CSV da aba VENDAS em blocos com esquema fixo, limpando cada bloco assim que ele chega
+def ler_em_blocos(arquivo, tamanho_bloco=TAMANHO_BLOCO, deslocamento=0):
+    try:
+        leitor = pd.read_csv(arquivo, usecols=COLUNAS_VENDAS, dtype=TIPOS_VENDAS, chunksize=tamanho_bloco)
+    except ValueError as e:
+        raise ErroEsquema(f"A aba VENDAS precisa das colunas {', '.join(COLUNAS_VENDAS)}: {e}") from e
+
+    with leitor:
+        for bruto in leitor:
+            bruto = bruto[COLUNAS_VENDAS]
+            convertido = converter_vendas(bruto)
+            quarentena, validas = separar_quarentena(bruto, convertido, deslocamento)
+            yield Bloco(filtrar_vendas(convertido[validas]), quarentena, len(bruto))
+
+
+def _vazia():
+    return pd.DataFrame(columns=COLUNAS_QUARENTENA)
+
+
+# 🧺 Junta quarentenas guardando no máximo `limite` linhas
+def juntar_quarentena(partes, limite=LIMITE_QUARENTENA):
+    partes = [parte for parte in partes if not parte.empty]
+    if not partes:
+        return _vazia()
+    return pd.concat(partes, ignore_index=True).head(limite)
+
+
+# 🧊 Cubo montado bloco a bloco: a memória depende do tamanho do bloco e do cubo, não da planilha
+def ingerir(arquivo, tamanho_bloco=TAMANHO_BLOCO):
+    cubo = None
+    quarentena = _vazia()
+    lidas = validas = em_quarentena = 0
+    for bloco in ler_em_blocos(arquivo, tamanho_bloco):
+        lidas += bloco.linhas_lidas
+        validas += len(bloco.vendas)
+        em_quarentena += len(bloco.quarentena)
+        if len(quarentena) < LIMITE_QUARENTENA:
+            quarentena = juntar_quarentena([quarentena, bloco.quarentena])
+        parcial = construir_cubo(bloco.vendas)
+        cubo = parcial if cubo is None else construir_cubo(_unir_cubos(cubo, parcial))
+    if cubo is None:
+        cubo = construir_cubo(filtrar_vendas(converter_vendas(pd.DataFrame(columns=COLUNAS_VENDAS))))
+    return Ingestao(cubo, quarentena, lidas, validas, em_quarentena)
+
+
+# 🔗 Cubos de blocos diferentes têm categorias diferentes; une as categorias antes de somar de novo
+def _unir_cubos(a, b):
+    unido = pd.concat([a, b], ignore_index=True)
+    for coluna in ("REP.", "EMPRESA"):
+        unido[coluna] = unido[coluna].astype("category")
+    unido["MÊS"] = unido["MÊS"].astype(a["MÊS"].dtype)
+    return unido
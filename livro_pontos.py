@@ -0,0 +1,160 @@
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+
+import pandas as pd
+
+from normalizacao import COLUNAS_PONTOS, COLUNAS_PONTUACAO, TIPO_MES
+
+
+CAMINHO_LIVRO = "pontos_extras.db"
+
+COLUNAS_HISTORICO = ["DATA", "AUTOR", "TIPO", "REP.", "MÊS"] + COLUNAS_PONTUACAO
+
+
+# 🧾 Um lançamento do livro: nunca é editado nem apagado.
+# Num "desfazer" o delta só registra o que foi zerado naquele momento; na leitura ele é um marco de zerar.
+@dataclass(frozen=True)
+class Lancamento:
+    id: int
+    rep: str
+    mes: str
+    acao: int
+    promocao: int
+    inadimplencia: int
+    autor: str
+    momento: float
+    tipo: str
+
+    @property
+    def delta(self):
+        return (self.acao, self.promocao, self.inadimplencia)
+
+
+def _somar(a, b):
+    return tuple(x + y for x, y in zip(a, b))
+
+
+# 📒 Livro de pontos extras indexado por (REP., MÊS) e persistido em SQLite
+class LivroPontos:
+    def __init__(self, caminho=CAMINHO_LIVRO):
+        self._lock = threading.RLock()
+        self._conexao = sqlite3.connect(caminho, check_same_thread=False)
+        self._conexao.execute(
+            """
+            CREATE TABLE IF NOT EXISTS lancamentos (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                rep TEXT NOT NULL,
+                mes TEXT NOT NULL,
+                acao INTEGER NOT NULL,
+                promocao INTEGER NOT NULL,
+                inadimplencia INTEGER NOT NULL,
+                autor TEXT NOT NULL,
+                momento REAL NOT NULL,
+                tipo TEXT NOT NULL
+            )
+            """
+        )
+        self._conexao.commit()
+        self._eventos = []
+        self._lancados = {}
+        self._zerados = set()
+        self._base = {}
+        self._versao_base = None
+        self._materializado = None
+        for linha in self._conexao.execute(
+            "SELECT id, rep, mes, acao, promocao, inadimplencia, autor, momento, tipo FROM lancamentos ORDER BY id"
+        ):
+            self._registrar(Lancamento(*linha))
+
+    # 🔢 Muda sempre que o conteúdo do livro muda (útil como chave de cache)
+    @property
+    def versao(self):
+        return (self._versao_base, len(self._eventos))
+
+    def _registrar(self, lancamento):
+        chave = (lancamento.rep, lancamento.mes)
+        self._eventos.append(lancamento)
+        if lancamento.tipo == "desfazer":
+            # Zera a chave seja qual for a base atual: só os lançamentos seguintes contam
+            self._lancados[chave] = (0, 0, 0)
+            self._zerados.add(chave)
+        else:
+            self._lancados[chave] = _somar(self._lancados.get(chave, (0, 0, 0)), lancamento.delta)
+        self._materializado = None
+
+    def _gravar(self, rep, mes, delta, autor, tipo):
+        momento = time.time()
+        cursor = self._conexao.execute(
+            "INSERT INTO lancamentos (rep, mes, acao, promocao, inadimplencia, autor, momento, tipo) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            (rep, mes, *delta, autor, momento, tipo),
+        )
+        self._conexao.commit()
+        lancamento = Lancamento(cursor.lastrowid, rep, mes, *delta, autor, momento, tipo)
+        self._registrar(lancamento)
+        return lancamento
+
+    # 📥 Pontos vindos da aba PONTOS_EXTRAS (substituídos a cada nova versão da planilha)
+    def definir_base(self, versao, pontos):
+        with self._lock:
+            if versao == self._versao_base:
+                return
+            soma = pontos.groupby(["REP.", "MÊS"], observed=True)[COLUNAS_PONTUACAO].sum()
+            self._base = {
+                (str(rep), str(mes)): tuple(int(v) for v in valores)
+                for (rep, mes), valores in zip(soma.index, soma.to_numpy())
+            }
+            self._versao_base = versao
+            self._materializado = None
+
+    # ➕ Soma pontos a (REP., MÊS)
+    def incluir(self, rep, mes, acao=0, promocao=0, inadimplencia=0, autor=""):
+        with self._lock:
+            return self._gravar(rep, mes, (int(acao), int(promocao), int(inadimplencia)), autor, "inclusao")
+
+    # ↩️ Zera (REP., MÊS): a partir daqui a base da planilha deixa de valer para essa chave
+    def desfazer(self, rep, mes, autor=""):
+        with self._lock:
+            atual = self.consultar(rep, mes)
+            if not any(atual):
+                return None
+            return self._gravar(rep, mes, tuple(-v for v in atual), autor, "desfazer")
+
+    # 🔎 Total atual de (REP., MÊS): lançamentos desde o último desfazer + base da planilha (se nunca foi desfeita)
+    def consultar(self, rep, mes):
+        chave = (rep, mes)
+        base = (0, 0, 0) if chave in self._zerados else self._base.get(chave, (0, 0, 0))
+        return _somar(base, self._lancados.get(chave, (0, 0, 0)))
+
+    # 📋 Totais por (REP., MÊS) no mesmo formato da aba PONTOS_EXTRAS
+    def materializar(self):
+        with self._lock:
+            if self._materializado is None:
+                linhas = [
+                    (rep, mes, *self.consultar(rep, mes))
+                    for rep, mes in dict.fromkeys([*self._base, *self._lancados])
+                ]
+                df = pd.DataFrame([linha for linha in linhas if any(linha[2:])], columns=COLUNAS_PONTOS)
+                df["MÊS"] = df["MÊS"].astype(TIPO_MES)
+                df[COLUNAS_PONTUACAO] = df[COLUNAS_PONTUACAO].astype("int64")
+                self._materializado = df
+            return self._materializado
+
+    # 🧾 Lançamentos a partir da posição `inicio` (para quem acompanha o livro aos poucos)
+    def lancamentos_desde(self, inicio):
+        with self._lock:
+            return self._eventos[inicio:]
+
+    # 🕓 Todos os lançamentos, do mais antigo ao mais recente
+    def historico(self):
+        with self._lock:
+            eventos = list(self._eventos)
+        return pd.DataFrame(
+            [
+                (pd.Timestamp(e.momento, unit="s"), e.autor, e.tipo, e.rep, e.mes, *e.delta)
+                for e in eventos
+            ],
+            columns=COLUNAS_HISTORICO,
+        )
@@ -0,0 +1,306 @@
+import argparse
+import os
+import sys
+import time
+import urllib.request
+
+import numpy as np
+import pandas as pd
+
+import cubo as cubo_vendas
+from armazem import ArmazemVendas
+from carregador import TIMEOUT, CarregadorPlanilha, url_aba
+from exportacao import Aba, gerar_excel
+from ingestao import ingerir
+from livro_pontos import LivroPontos
+from normalizacao import COLUNAS_PONTUACAO, MESES, normalizar_pontos
+from pontos import MODOS_AUSENTES, aplicar_pontos_extras
+
+
+# 🏅 Regras da classificação
+MULTIPLICADORES_TOPO = (5, 4, 3, 2)
+DIVISOR_PONTOS = 20000
+MEDALHAS = ["🥇", "🥈", "🥉", "🏅", "🏅"]
+TODOS_OS_MESES = "TODOS"
+
+COLUNAS_RANKING = ["REP.", "SUBTOTAL", "PONTOS", *COLUNAS_PONTUACAO, "TOTAL DE PONTOS"]
+CHAVES = ["ANO", "EMPRESA", "MÊS"]
+# Meses em ordem cronológica e o ano inteiro por último
+ORDEM_MESES = {mes: posicao for posicao, mes in enumerate([*MESES, TODOS_OS_MESES])}
+
+
+# ✖️ Multiplicador pela posição: 1º vale 5x, 2º 4x, 3º 3x, 4º 2x e o resto 1x
+def multiplicadores(quantidade):
+    resto = np.ones(max(quantidade - len(MULTIPLICADORES_TOPO), 0), dtype=int)
+    return np.concatenate([MULTIPLICADORES_TOPO, resto])[:quantidade]
+
+
+def pontos_por_posicao(subtotais):
+    return (subtotais / DIVISOR_PONTOS * multiplicadores(len(subtotais))).round().astype(int)
+
+
+# 🏆 Ranking (sem linha de total) a partir do cubo e dos pontos extras
+def calcular_ranking(cubo, pontos, ano, empresa="Todas", meses=None, ausentes="descartar"):
+    ranking = cubo_vendas.vendas_por_rep(cubo, ano, empresa, meses).reset_index()
+    if ranking.empty:
+        return pd.DataFrame(columns=COLUNAS_RANKING)
+    ranking["PONTOS"] = pontos_por_posicao(ranking["SUBTOTAL"])
+    return _com_pontos_extras(ranking, pontos, meses, ausentes)
+
+
+def _com_pontos_extras(ranking, pontos, meses=None, ausentes="descartar"):
+    ranking = aplicar_pontos_extras(ranking, pontos, meses, ausentes)
+    ranking["TOTAL DE PONTOS"] = ranking[["PONTOS", *COLUNAS_PONTUACAO]].sum(axis=1)
+    return ranking
+
+
+# 🔢 Coluna POSIÇÃO com medalhas e linha TOTAL GERAL
+def adicionar_totais(ranking, total_subtotal):
+    linha_total = pd.DataFrame({
+        "REP.": ["TOTAL GERAL"],
+        "SUBTOTAL": [total_subtotal],
+        **{coluna: [ranking[coluna].sum()] for coluna in ["PONTOS", *COLUNAS_PONTUACAO, "TOTAL DE PONTOS"]},
+    })
+    ranking_final = pd.concat([ranking, linha_total], ignore_index=True)
+
+    posicoes = [MEDALHAS[i] if i < len(MEDALHAS) else f"{i+1}º" for i in range(len(ranking))]
+    posicoes.append("🔢")  # Para TOTAL GERAL
+    ranking_final.insert(0, "POSIÇÃO", posicoes)
+    return ranking_final
+
+
+# 📋 Tabela completa da Classificação Geral (a mesma exibida no app)
+def classificacao(cubo, pontos, ano, empresa="Todas", meses=None, ausentes="descartar"):
+    ranking = calcular_ranking(cubo, pontos, ano, empresa, meses, ausentes)
+    if ranking.empty:
+        return ranking
+    return adicionar_totais(ranking, cubo_vendas.total_vendas(cubo, ano, empresa, meses))
+
+
+# 🧪 Mesma função partindo das abas já normalizadas (sem cubo pronto)
+def classificar(vendas, pontos, ano, empresa="Todas", meses=None, ausentes="descartar"):
+    return classificacao(cubo_vendas.construir_cubo(vendas), pontos, ano, empresa, meses, ausentes)
+
+
+# 🗓️ Todas as combinações ANO × EMPRESA (+ "Todas") × MÊS (+ ano inteiro) presentes no cubo
+def combinacoes(cubo):
+    for ano in cubo_vendas.anos(cubo):
+        fatia_ano = cubo_vendas.fatiar(cubo, ano=ano)
+        for empresa in ["Todas"] + cubo_vendas.empresas(fatia_ano):
+            fatia = cubo_vendas.fatiar(fatia_ano, empresa=empresa)
+            for mes in [TODOS_OS_MESES] + cubo_vendas.meses(fatia):
+                yield ano, empresa, mes
+
+
+# 🐢 Caminho sequencial: um filtro + groupby + junção de pontos por combinação
+def rankings_sequencial(cubo, pontos, ausentes="descartar"):
+    rankings = {}
+    for ano, empresa, mes in combinacoes(cubo):
+        meses = None if mes == TODOS_OS_MESES else [mes]
+        tabela = classificacao(cubo, pontos, ano, empresa, meses, ausentes)
+        if not tabela.empty:
+            rankings[(ano, empresa, mes)] = tabela
+    return rankings
+
+
+# 🧮 SUBTOTAL por combinação: cada mês e o ano inteiro, cada empresa e "Todas"
+def _vendas_por_combinacao(cubo):
+    base = cubo.astype({"EMPRESA": object, "MÊS": object, "REP.": object})
+    por_mes = base.dropna(subset=["MÊS"])
+    niveis = [
+        (por_mes.dropna(subset=["EMPRESA"]), ["ANO", "EMPRESA", "MÊS"], {}),
+        (por_mes, ["ANO", "MÊS"], {"EMPRESA": "Todas"}),
+        (base.dropna(subset=["EMPRESA"]), ["ANO", "EMPRESA"], {"MÊS": TODOS_OS_MESES}),
+        (base, ["ANO"], {"EMPRESA": "Todas", "MÊS": TODOS_OS_MESES}),
+    ]
+    partes = [
+        fatia.groupby([*chaves, "REP."], dropna=False)["SUBTOTAL"].sum().reset_index().assign(**fixos)
+        for fatia, chaves, fixos in niveis
+    ]
+    return pd.concat(partes, ignore_index=True)[[*CHAVES, "REP.", "SUBTOTAL"]]
+
+
+# ➕ Pontos extras por (MÊS, REP.), mais o total do ano inteiro em MÊS = "TODOS"
+def _pontos_por_mes(pontos):
+    base = pontos.astype({"MÊS": object})
+    por_mes = base.dropna(subset=["MÊS"]).groupby(["MÊS", "REP."])[COLUNAS_PONTUACAO].sum().reset_index()
+    todos = base.groupby("REP.")[COLUNAS_PONTUACAO].sum().reset_index().assign(**{"MÊS": TODOS_OS_MESES})
+    resultado = pd.concat([por_mes, todos], ignore_index=True)
+    resultado["REP."] = resultado["REP."].astype(str)
+    return resultado
+
+
+# 💰 Ordem e PONTOS por posição de todas as combinações (só dependem das vendas) e o SUBTOTAL de cada TOTAL GERAL
+def _ranking_de_vendas(cubo):
+    vendas = _vendas_por_combinacao(cubo)
+    totais = vendas.groupby(CHAVES, sort=False)["SUBTOTAL"].sum()
+
+    ranking = vendas.dropna(subset=["REP."]).astype({"REP.": str})
+    ranking = ranking.sort_values([*CHAVES, "SUBTOTAL", "REP."], ascending=[True, True, True, False, True], kind="stable")
+    posicao = ranking.groupby(CHAVES, sort=False).cumcount().to_numpy()
+    topo = np.array(MULTIPLICADORES_TOPO)
+    multiplicador = np.where(posicao < len(topo), topo[np.minimum(posicao, len(topo) - 1)], 1)
+    ranking["PONTOS"] = (ranking["SUBTOTAL"] / DIVISOR_PONTOS * multiplicador).round().astype(int)
+    return ranking, totais
+
+
+def _chave_ordem(coluna):
+    return coluna.map(ORDEM_MESES) if coluna.name == "MÊS" else coluna
+
+
+# ⚡ Todas as combinações em uma única passada agrupada (ordenação + cumcount + junções)
+def classificar_tudo(cubo, pontos, ausentes="descartar"):
+    if ausentes not in MODOS_AUSENTES:
+        raise ValueError(f"Modo inválido para representantes sem venda: {ausentes!r}")
+
+    ranking, totais = _ranking_de_vendas(cubo)
+
+    pontos_mes = _pontos_por_mes(pontos)
+    if ausentes == "incluir":
+        combinacoes_com_venda = ranking[CHAVES].drop_duplicates()
+        candidatos = combinacoes_com_venda.merge(pontos_mes[["MÊS", "REP."]], on="MÊS")
+        sem_venda = candidatos.merge(ranking[[*CHAVES, "REP."]], on=[*CHAVES, "REP."], how="left", indicator=True)
+        sem_venda = sem_venda[sem_venda["_merge"] == "left_only"].drop(columns="_merge")
+        ranking = pd.concat([ranking, sem_venda.assign(SUBTOTAL=0.0, PONTOS=0)], ignore_index=True)
+        ranking = ranking.sort_values([*CHAVES, "SUBTOTAL", "REP."], ascending=[True, True, True, False, True], kind="stable")
+
+    ranking = ranking.merge(pontos_mes, on=["MÊS", "REP."], how="left")
+    ranking[COLUNAS_PONTUACAO] = ranking[COLUNAS_PONTUACAO].fillna(0).astype(int)
+    ranking["TOTAL DE PONTOS"] = ranking[["PONTOS", *COLUNAS_PONTUACAO]].sum(axis=1)
+
+    posicao = ranking.groupby(CHAVES, sort=False).cumcount().to_numpy()
+    medalhas = np.array(MEDALHAS, dtype=object)
+    ranking.insert(len(CHAVES), "POSIÇÃO", np.where(
+        posicao < len(medalhas),
+        medalhas[np.minimum(posicao, len(medalhas) - 1)],
+        pd.Series(posicao + 1).astype(str).to_numpy() + "º",
+    ))
+
+    linhas_total = ranking.groupby(CHAVES, sort=False)[["PONTOS", *COLUNAS_PONTUACAO, "TOTAL DE PONTOS"]].sum()
+    linhas_total.insert(0, "SUBTOTAL", totais.reindex(linhas_total.index))
+    linhas_total = linhas_total.reset_index().assign(**{"POSIÇÃO": "🔢", "REP.": "TOTAL GERAL"})
+
+    ranking["_ordem"] = 0
+    resultado = pd.concat([ranking, linhas_total.assign(_ordem=1)], ignore_index=True)
+    resultado = resultado.sort_values([*CHAVES, "_ordem"], key=_chave_ordem, kind="stable").drop(columns="_ordem")
+    return resultado[[*CHAVES, "POSIÇÃO", *COLUNAS_RANKING]].reset_index(drop=True)
+
+
+# 📚 Dicionário (ANO, EMPRESA, MÊS) -> tabela da Classificação Geral, pronto para consulta direta
+def rankings_por_combinacao(cubo, pontos, ausentes="descartar"):
+    tudo = classificar_tudo(cubo, pontos, ausentes)
+    return {
+        (int(ano), empresa, mes): tabela.drop(columns=CHAVES).reset_index(drop=True)
+        for (ano, empresa, mes), tabela in tudo.groupby(CHAVES, sort=False)
+    }
+
+
+# 💰 Parte de vendas de cada ranking (REP., SUBTOTAL, PONTOS) e o SUBTOTAL do TOTAL GERAL, por (ANO, EMPRESA, MÊS).
+# Não depende dos pontos extras: lançar pontos não invalida o cálculo, eles entram em completar_ranking
+def rankings_de_vendas(cubo):
+    ranking, totais = _ranking_de_vendas(cubo)
+    return {
+        (int(ano), empresa, mes): (tabela.drop(columns=CHAVES).reset_index(drop=True), totais[(ano, empresa, mes)])
+        for (ano, empresa, mes), tabela in ranking.groupby(CHAVES, sort=False)
+    }
+
+
+# ➕ Pontos extras do momento sobre a parte de vendas pré-calculada: mesma tabela de classificacao
+def completar_ranking(vendas, total_subtotal, pontos, meses=None, ausentes="descartar"):
+    return adicionar_totais(_com_pontos_extras(vendas, pontos, meses, ausentes), total_subtotal)
+
+
+# ⏱️ Mede o caminho agrupado contra o sequencial (e confere se os resultados batem)
+def medir_ganho(cubo, pontos, ausentes="descartar"):
+    inicio = time.perf_counter()
+    sequencial = rankings_sequencial(cubo, pontos, ausentes)
+    tempo_sequencial = time.perf_counter() - inicio
+
+    inicio = time.perf_counter()
+    agrupado = rankings_por_combinacao(cubo, pontos, ausentes)
+    tempo_agrupado = time.perf_counter() - inicio
+
+    iguais = sequencial.keys() == agrupado.keys() and all(
+        _mesma_tabela(sequencial[chave], agrupado[chave]) for chave in sequencial
+    )
+    return {
+        "combinacoes": len(agrupado),
+        "tempo_sequencial": tempo_sequencial,
+        "tempo_agrupado": tempo_agrupado,
+        "ganho": tempo_sequencial / tempo_agrupado if tempo_agrupado else float("inf"),
+        "iguais": iguais,
+    }
+
+
+def _mesma_tabela(a, b):
+    try:
+        pd.testing.assert_frame_equal(a.reset_index(drop=True), b, check_dtype=False)
+        return True
+    except AssertionError:
+        return False
+
+
+def _url(fonte):
+    return fonte.startswith(("http://", "https://"))
+
+
+def _ler_fonte(fonte, parser=pd.read_csv):
+    if _url(fonte):
+        return CarregadorPlanilha(fonte, parser=parser).obter().dados
+    return parser(fonte)
+
+
+# 🧊 Cubo das vendas: do snapshot local ou do CSV lido em blocos (com quarentena das linhas inválidas).
+# Uma URL é lida direto da resposta HTTP, bloco a bloco, sem guardar o corpo inteiro em memória.
+def _cubo_vendas(fonte):
+    if os.path.isdir(fonte):
+        return cubo_vendas.construir_cubo(ArmazemVendas(fonte).carregar()), None
+    if _url(fonte):
+        with urllib.request.urlopen(fonte, timeout=TIMEOUT) as resposta:
+            resultado = ingerir(resposta)
+    else:
+        resultado = ingerir(fonte)
+    return resultado.cubo, resultado
+
+
+def salvar(resultado, caminho):
+    if caminho.endswith(".parquet"):
+        resultado.to_parquet(caminho, index=False)
+    elif caminho.endswith(".xlsx"):
+        with open(caminho, "wb") as arquivo:
+            arquivo.write(gerar_excel([Aba("Rankings", resultado, ("SUBTOTAL",))]))
+    else:
+        raise ValueError(f"Formato de saída não suportado: {caminho} (use .parquet ou .xlsx)")
+
+
+# 🖥️ Linha de comando: python motor_ranking.py --saida rankings.parquet
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Calcula a Classificação Geral para todas as combinações de ano, empresa e mês.")
+    parser.add_argument("--vendas", default=url_aba("VENDAS"), help="CSV da aba VENDAS (arquivo ou URL) ou diretório do snapshot local")
+    parser.add_argument("--pontos", default=url_aba("PONTOS_EXTRAS"), help="CSV da aba PONTOS_EXTRAS (arquivo ou URL)")
+    parser.add_argument("--livro", help="Arquivo SQLite do livro de pontos extras a somar aos pontos da planilha")
+    parser.add_argument("--ausentes", choices=["descartar", "incluir"], default="descartar",
+                        help="Representantes com pontos extras e sem venda")
+    parser.add_argument("--saida", required=True, help="Arquivo de saída (.parquet ou .xlsx)")
+    parser.add_argument("--quarentena", help="CSV para gravar as linhas de VENDAS que não puderam ser interpretadas")
+    args = parser.parse_args(argv)
+
+    cubo, ingestao = _cubo_vendas(args.vendas)
+    if ingestao is not None and ingestao.linhas_quarentena:
+        print(f"⚠️ {ingestao.linhas_quarentena} de {ingestao.linhas_lidas} linhas de VENDAS em quarentena", file=sys.stderr)
+        if args.quarentena:
+            ingestao.quarentena.to_csv(args.quarentena, index=False)
+    pontos = normalizar_pontos(_ler_fonte(args.pontos))
+    if args.livro:
+        livro = LivroPontos(args.livro)
+        livro.definir_base("cli", pontos)
+        pontos = livro.materializar()
+
+    resultado = classificar_tudo(cubo, pontos, args.ausentes)
+    salvar(resultado, args.saida)
+    print(f"✅ {resultado[['ANO', 'EMPRESA', 'MÊS']].drop_duplicates().shape[0]} rankings gravados em {args.saida}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
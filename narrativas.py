@@ -0,0 +1,215 @@
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from html import escape
+from string import Template
+
+import pandas as pd
+
+
+TOP_REPS = 5
+TOP_MESES = 3
+TAMANHO_CACHE = 128
+
+COR_ALTA = "green"
+COR_QUEDA = "red"
+
+
+# 📝 Modelos das narrativas: HTML para o app/e-mail e texto puro para o corpo alternativo do e-mail
+MODELOS = {
+    "venda_geral": {
+        "html": Template(
+            "<p style='font-size:16px'>\n"
+            "No ano de <strong>$ano</strong>, os $n representantes com maior volume de vendas foram:<br>\n"
+            "<strong>$maiores</strong>.<br><br>\n"
+            "Os $n com menor desempenho foram:<br>\n"
+            "<strong>$menores</strong>.<br><br>\n"
+            "Comparando $ano com $ano_anterior:<br>\n"
+            "Os maiores crescimentos foram de <strong>$crescimentos</strong> — destaque para "
+            "<strong>$destaque_crescimento</strong> com crescimento de $valor_crescimento.<br>\n"
+            "As maiores quedas foram de <strong>$quedas</strong> — destaque para "
+            "<strong>$destaque_queda</strong> com queda de $valor_queda.\n"
+            "</p>"
+        ),
+        "texto": Template(
+            "No ano de $ano, os $n representantes com maior volume de vendas foram: $maiores.\n"
+            "Os $n com menor desempenho foram: $menores.\n"
+            "Comparando $ano com $ano_anterior, os maiores crescimentos foram de $crescimentos — destaque para "
+            "$destaque_crescimento com crescimento de $valor_crescimento.\n"
+            "As maiores quedas foram de $quedas — destaque para $destaque_queda com queda de $valor_queda."
+        ),
+    },
+    "variacao_anual": {
+        "html": Template(
+            "<p style='font-size:16px'>\n"
+            "Em $ano_comparado, as vendas apresentaram uma variação total de $variacao_total "
+            "em relação ao ano de $ano_base.<br>\n"
+            "Os meses com maior crescimento foram: <strong>$melhores</strong> — com destaque para "
+            "<strong>$melhor_mes</strong>, que cresceu $valor_melhor<br>\n"
+            "Já os meses com pior desempenho foram: <strong>$piores</strong> — sendo "
+            "<strong>$pior_mes</strong> o mais crítico, com queda de $valor_pior.\n"
+            "</p>"
+        ),
+        "texto": Template(
+            "Em $ano_comparado, as vendas apresentaram uma variação total de $variacao_total "
+            "em relação ao ano de $ano_base.\n"
+            "Os meses com maior crescimento foram: $melhores — com destaque para $melhor_mes, que cresceu $valor_melhor.\n"
+            "Já os meses com pior desempenho foram: $piores — sendo $pior_mes o mais crítico, com queda de $valor_pior."
+        ),
+    },
+}
+
+
+# 🔝 Maiores e menores valores de uma série, sem ordenar a série inteira (nlargest/nsmallest)
+@dataclass(frozen=True)
+class Destaques:
+    maiores: pd.Series
+    menores: pd.Series
+
+
+def destaques(serie, n):
+    return Destaques(serie.nlargest(n), serie.nsmallest(n))
+
+
+# 🗣️ Uma narrativa pronta: título + versões HTML e texto do mesmo conteúdo
+@dataclass(frozen=True)
+class Narrativa:
+    titulo: str
+    html: str
+    texto: str
+
+
+def _percentual_html(valor, cor=None):
+    if cor is None:
+        cor = COR_ALTA if valor > 0 else COR_QUEDA if valor < 0 else "black"
+    return f"<span style='color:{cor}; font-weight:bold'>{valor:.2f}%</span>"
+
+
+def _nomes(indice):
+    return ", ".join(map(str, indice))
+
+
+def _renderizar(modelo, titulo, textos, percentuais, cores=None):
+    cores = cores or {}
+    html = MODELOS[modelo]["html"].substitute(
+        {chave: escape(str(valor)) for chave, valor in textos.items()},
+        **{chave: _percentual_html(valor, cores.get(chave)) for chave, valor in percentuais.items()},
+    )
+    texto = MODELOS[modelo]["texto"].substitute(
+        textos, **{chave: f"{valor:.2f}%" for chave, valor in percentuais.items()}
+    )
+    return Narrativa(titulo, html, texto)
+
+
+# 🧠 Narrativas de um snapshot das vendas (PainelVariacao), memorizadas por (tipo, ano, filtros) em LRU
+class Narrador:
+    def __init__(self, painel, tamanho_cache=TAMANHO_CACHE):
+        self.painel = painel
+        self.tamanho_cache = tamanho_cache
+        self._cache = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _memorizar(self, chave, calcular):
+        with self._lock:
+            if chave in self._cache:
+                self._cache.move_to_end(chave)
+                return self._cache[chave]
+        valor = calcular()
+        with self._lock:
+            self._cache[chave] = valor
+            self._cache.move_to_end(chave)
+            while len(self._cache) > self.tamanho_cache:
+                self._cache.popitem(last=False)
+        return valor
+
+    def _ano_anterior(self, ano):
+        anteriores = [a for a in self.painel.anos if a < ano]
+        return anteriores[-1] if anteriores else None
+
+    # 👥 Quem mais e quem menos vendeu no ano
+    def destaques_reps(self, ano, n=TOP_REPS):
+        return self._memorizar(("reps", ano, n), lambda: destaques(self.painel.reps[ano].dropna(), n))
+
+    # 📈 Maiores crescimentos e quedas (%) por representante entre dois anos
+    def destaques_variacao_reps(self, ano_base, ano_comparado, n=TOP_REPS):
+        return self._memorizar(
+            ("variacao_reps", ano_base, ano_comparado, n),
+            lambda: destaques(self.painel.comparar_reps(ano_base, ano_comparado)["VARIAÇÃO (%)"], n),
+        )
+
+    # 🗓️ Meses que mais cresceram e que mais caíram entre dois anos (sem a linha TOTAL GERAL)
+    def destaques_meses(self, ano_base, ano_comparado, n=TOP_MESES):
+        def calcular():
+            comparativo = self.painel.comparar_meses(ano_base, ano_comparado).drop(index="TOTAL GERAL")
+            return destaques(comparativo["VARIAÇÃO (%)"], n)
+        return self._memorizar(("meses", ano_base, ano_comparado, n), calcular)
+
+    # 🗣️ Narrativa da Venda Geral: comparação com o ano anterior com vendas (None se não houver)
+    def venda_geral(self, ano, n=TOP_REPS):
+        def calcular():
+            ano_anterior = self._ano_anterior(ano)
+            if ano_anterior is None:
+                return None
+            vendas = self.destaques_reps(ano, n)
+            variacao = self.destaques_variacao_reps(ano_anterior, ano, n)
+            return _renderizar(
+                "venda_geral",
+                f"Narrativa de Representantes - {ano}",
+                {
+                    "ano": ano,
+                    "ano_anterior": ano_anterior,
+                    "n": n,
+                    "maiores": _nomes(vendas.maiores.index),
+                    # Do maior para o menor, como na tabela
+                    "menores": _nomes(vendas.menores.index[::-1]),
+                    "crescimentos": _nomes(variacao.maiores.index),
+                    "destaque_crescimento": variacao.maiores.index[0],
+                    "quedas": _nomes(variacao.menores.index),
+                    "destaque_queda": variacao.menores.index[0],
+                },
+                {"valor_crescimento": variacao.maiores.iloc[0], "valor_queda": variacao.menores.iloc[0]},
+                {"valor_crescimento": COR_ALTA, "valor_queda": COR_QUEDA},
+            )
+        return self._memorizar(("venda_geral", ano, n), calcular)
+
+    # 🗣️ Narrativa da Análise de Variação Anual entre dois anos
+    def variacao_anual(self, ano_base, ano_comparado, n=TOP_MESES):
+        def calcular():
+            meses = self.destaques_meses(ano_base, ano_comparado, n)
+            comparativo = self.painel.comparar_meses(ano_base, ano_comparado)
+            return _renderizar(
+                "variacao_anual",
+                f"Desempenho Anual - {ano_base} x {ano_comparado}",
+                {
+                    "ano_base": ano_base,
+                    "ano_comparado": ano_comparado,
+                    "melhores": _nomes(meses.maiores.index),
+                    "melhor_mes": meses.maiores.index[0],
+                    "piores": _nomes(meses.menores.index),
+                    "pior_mes": meses.menores.index[0],
+                },
+                {
+                    "variacao_total": comparativo.loc["TOTAL GERAL", "VARIAÇÃO (%)"],
+                    "valor_melhor": meses.maiores.iloc[0],
+                    "valor_pior": meses.menores.iloc[0],
+                },
+            )
+        return self._memorizar(("variacao_anual", ano_base, ano_comparado, n), calcular)
+
+    # 📬 Todas as narrativas de uma vez (e-mail, relatório): cada ano contra o anterior com vendas
+    def em_lote(self, anos=None):
+        narrativas = []
+        for ano in anos or self.painel.anos:
+            ano_anterior = self._ano_anterior(ano)
+            if ano_anterior is None:
+                continue
+            narrativas.append(self.venda_geral(ano))
+            narrativas.append(self.variacao_anual(ano_anterior, ano))
+        return narrativas
+
+
+# 📧 Várias narrativas em um único corpo de e-mail (HTML e texto)
+def corpo_email(narrativas):
+    html = "\n".join(f"<h3>{escape(n.titulo)}</h3>\n{n.html}" for n in narrativas)
+    texto = "\n\n".join(f"{n.titulo}\n{n.texto}" for n in narrativas)
+    return html, texto
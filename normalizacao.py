@@ -0,0 +1,92 @@
+import pandas as pd
+
+
+# 📅 Meses em ordem cronológica (nome completo e abreviação de 3 letras)
+MESES = ["JANEIRO", "FEVEREIRO", "MARÇO", "ABRIL", "MAIO", "JUNHO",
+         "JULHO", "AGOSTO", "SETEMBRO", "OUTUBRO", "NOVEMBRO", "DEZEMBRO"]
+ABREVIACOES = [mes[:3] for mes in MESES]
+TIPO_MES = pd.CategoricalDtype(MESES, ordered=True)
+
+COLUNAS_VENDAS = ["REP.", "SUBTOTAL", "MÊS", "EMPRESA", "ANO"]
+COLUNAS_PONTOS = ["REP.", "MÊS", "AÇÃO", "PROMOÇÃO", "INADIMPLÊNCIA"]
+COLUNAS_PONTUACAO = ["AÇÃO", "PROMOÇÃO", "INADIMPLÊNCIA"]
+
+
+# 🔧 Converte uma coluna inteira de valores em reais ("R$ 1.234,56") para float.
+# "." é separador de milhar no formato brasileiro (com "," ou "R$", ou em grupos de 3 como "1.234.567");
+# um único "." fora disso ("1234.56", "99.9") já é o ponto decimal.
+def limpar_valores(serie):
+    if pd.api.types.is_numeric_dtype(serie):
+        return serie.astype("float64")
+    texto = serie.astype("string").str.strip()
+    brl = (
+        texto.str.contains(",", regex=False)
+        | texto.str.contains("R$", regex=False)
+        | texto.str.fullmatch(r"-?\d{1,3}(\.\d{3})+")
+    )
+    simples = texto.str.fullmatch(r"-?\d+(\.\d+)?")
+    convertido = (
+        texto.str.replace("R$", "", regex=False)
+        .str.replace(r"\s", "", regex=True)
+        .str.replace(".", "", regex=False)
+        .str.replace(",", ".", regex=False)
+    )
+    texto = convertido.where(brl.fillna(False), texto.where(simples.fillna(False)))
+    return pd.to_numeric(texto, errors="coerce").astype("float64")
+
+
+# 📅 Aceita "jan", "JAN", "Janeiro", " março " etc. e devolve um categórico ordenado
+def normalizar_meses(serie):
+    chave = serie.astype("string").str.strip().str.upper().str[:3].astype("category")
+    meses = chave.map(dict(zip(ABREVIACOES, MESES)))
+    return meses.astype(TIPO_MES)
+
+
+# 🔤 Troca "JANEIRO" por "JAN" sem tocar nos códigos do categórico
+def abreviar_meses(serie):
+    return serie.cat.rename_categories(ABREVIACOES)
+
+
+# 🔄 Colunas da aba VENDAS convertidas (valores inválidos viram NaN, nada é descartado ainda)
+def converter_vendas(bruto):
+    return pd.DataFrame({
+        "REP.": bruto["REP."],
+        "SUBTOTAL": limpar_valores(bruto["SUBTOTAL"]),
+        "MÊS": normalizar_meses(bruto["MÊS"]),
+        "EMPRESA": bruto["EMPRESA"],
+        "ANO": pd.to_numeric(bruto["ANO"], errors="coerce"),
+    })
+
+
+# 🧹 Limpeza única da aba VENDAS: valores em float, meses ordenados e tipos compactos
+def normalizar_vendas(bruto):
+    return filtrar_vendas(converter_vendas(bruto))
+
+
+# 🚮 Só vendas positivas com ano, em tipos compactos
+def filtrar_vendas(df):
+    df = df[df["SUBTOTAL"].notnull() & (df["SUBTOTAL"] > 0) & df["ANO"].notnull()]
+    return df.assign(
+        **{
+            "REP.": df["REP."].astype("category"),
+            "EMPRESA": df["EMPRESA"].astype("category"),
+            "ANO": df["ANO"].astype("int16"),
+        }
+    ).reset_index(drop=True)
+
+
+# 🧹 Limpeza da aba PONTOS_EXTRAS no mesmo formato de meses das vendas
+def normalizar_pontos(bruto):
+    if bruto is None or bruto.empty:
+        return pd.DataFrame({
+            "REP.": pd.Series(dtype="object"),
+            "MÊS": pd.Series(dtype=TIPO_MES),
+            **{coluna: pd.Series(dtype="int64") for coluna in COLUNAS_PONTUACAO},
+        })
+    df = pd.DataFrame({"REP.": bruto["REP."], "MÊS": normalizar_meses(bruto["MÊS"])})
+    for coluna in COLUNAS_PONTUACAO:
+        if coluna in bruto.columns:
+            df[coluna] = pd.to_numeric(bruto[coluna], errors="coerce").fillna(0).astype("int64")
+        else:
+            df[coluna] = 0
+    return df.reset_index(drop=True)
@@ -0,0 +1,96 @@
+import math
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+
+TAMANHO_PAGINA = 50
+OPCOES_TOPO = {"Todos": None, "Top 10": 10, "Top 20": 20, "Top 50": 50, "Top 100": 100}
+
+ESTILO_TOTAL = "font-weight: bold; background-color: #f0f0f0"
+ESTILO_ALTA = "color: green; font-weight: bold"
+ESTILO_QUEDA = "color: red; font-weight: bold"
+
+
+# 📄 Uma página da tabela: só essas linhas (e as fixas, como o total) são formatadas e enviadas ao navegador
+@dataclass(frozen=True)
+class Pagina:
+    dados: pd.DataFrame
+    numero: int
+    paginas: int
+    inicio: int
+    fim: int
+    encontradas: int
+
+
+def _rotulos(df, coluna=None):
+    return df.index if coluna is None else df[coluna]
+
+
+# 🔎 Linhas cujo rótulo (índice ou `coluna`) contém o termo, sem diferenciar maiúsculas
+def buscar(df, termo, coluna=None):
+    if not termo:
+        return df
+    rotulos = pd.Series(_rotulos(df, coluna), index=df.index).astype(str)
+    return df[rotulos.str.contains(termo, case=False, regex=False).to_numpy()]
+
+
+# ✂️ Top N → busca → fatia da página; as linhas `fixas` (totais) ficam fora da paginação e vão no fim
+def paginar(df, numero=1, tamanho=TAMANHO_PAGINA, busca="", coluna=None, topo=None, fixas=()):
+    fixa = np.asarray(pd.Index(_rotulos(df, coluna)).isin(fixas))
+    corpo = df[~fixa]
+    if topo:
+        corpo = corpo.head(topo)
+    corpo = buscar(corpo, busca, coluna)
+
+    paginas = max(1, math.ceil(len(corpo) / tamanho))
+    numero = min(max(int(numero), 1), paginas)
+    inicio = (numero - 1) * tamanho
+    pedaco = corpo.iloc[inicio:inicio + tamanho]
+    if fixa.any():
+        pedaco = pd.concat([pedaco, df[fixa]])
+    return Pagina(pedaco, numero, paginas, inicio, inicio + min(tamanho, len(corpo) - inicio), len(corpo))
+
+
+# 🎨 CSS de cada célula calculado em bloco: linhas de total destacadas e variação verde (>0) / vermelha (<0)
+def estilos_destaque(df, linhas_total=(), colunas_variacao=()):
+    total = np.asarray(df.index.isin(linhas_total))
+    estilos = np.where(total[:, None], ESTILO_TOTAL, "").astype(object)
+    estilos = np.broadcast_to(estilos, df.shape).copy()
+    for coluna in colunas_variacao:
+        posicao = df.columns.get_loc(coluna)
+        valores = df[coluna].to_numpy(dtype="float64", na_value=np.nan)
+        cor = np.select([valores > 0, valores < 0], [ESTILO_ALTA, ESTILO_QUEDA], "").astype(object)
+        estilos[:, posicao] = np.where(cor == "", estilos[:, posicao], np.where(total, ESTILO_TOTAL + "; " + cor, cor))
+    return pd.DataFrame(estilos, index=df.index, columns=df.columns)
+
+
+# 🧭 Configuração das colunas formatadas (texto de formatacao.py) no st.dataframe
+def config_colunas(colunas_brl=(), colunas_percentual=()):
+    return {coluna: st.column_config.TextColumn(coluna, alignment="right") for coluna in [*colunas_brl, *colunas_percentual]}
+
+
+# 🎛️ Busca, top N e página escolhidos pelo usuário (estado guardado por `chave`)
+def controles_pagina(df, chave, coluna=None, fixas=(), tamanho=TAMANHO_PAGINA, rotulo="representantes"):
+    col_busca, col_topo, col_pagina = st.columns([3, 1, 1])
+    with col_busca:
+        busca = st.text_input("🔎 Buscar representante", key=f"{chave}_busca").strip()
+    with col_topo:
+        topo = OPCOES_TOPO[st.selectbox("Mostrar", options=list(OPCOES_TOPO), key=f"{chave}_topo")]
+
+    # Busca ou top N novos começam da primeira página
+    if st.session_state.get(f"{chave}_filtro") != (busca, topo):
+        st.session_state[f"{chave}_filtro"] = (busca, topo)
+        st.session_state[f"{chave}_pagina"] = 1
+
+    pagina = paginar(df, st.session_state.get(f"{chave}_pagina", 1), tamanho, busca, coluna, topo, fixas)
+    if pagina.paginas > 1:
+        # A tabela pode ter encolhido (outro ano, outro filtro): fica na última página que existe
+        st.session_state[f"{chave}_pagina"] = pagina.numero
+        with col_pagina:
+            st.number_input("Página", min_value=1, max_value=pagina.paginas, step=1, key=f"{chave}_pagina")
+    if pagina.paginas > 1 or busca or topo:
+        st.caption(f"Mostrando {pagina.inicio + 1 if pagina.encontradas else 0}–{pagina.fim} de {pagina.encontradas} {rotulo}")
+    return pagina
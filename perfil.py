@@ -0,0 +1,165 @@
+import json
+import os
+import threading
+import time
+import tracemalloc
+import weakref
+
+
+# 🏷️ Etapas de uma execução da página, na ordem em que costumam acontecer
+ETAPAS = ["carga", "limpeza", "filtro", "agregacao", "pontos", "formatacao", "renderizacao", "exportacao"]
+
+
+# 📏 Linhas e bytes de um DataFrame/Series (sem deep=True, que custaria tanto quanto a etapa)
+def tamanho(dados):
+    if dados is None:
+        return 0, 0
+    if isinstance(dados, (bytes, bytearray)):
+        return 0, len(dados)
+    uso = dados.memory_usage(index=True)
+    return len(dados), int(uso.sum() if hasattr(uso, "sum") else uso)
+
+
+# 💤 Perfil desligado: mesmo objeto em toda etapa, nada é medido nem guardado
+class _Desligado:
+    def registrar(self, dados=None, linhas=0, bytes=0):
+        return dados
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_DESLIGADO = _Desligado()
+
+# 🧮 tracemalloc é global no processo: liga na primeira sessão que pede memória e só desliga quando a última termina
+_lock_memoria = threading.Lock()
+_sessoes_memoria = 0
+_ligado_aqui = False
+
+
+def _ligar_memoria():
+    global _sessoes_memoria, _ligado_aqui
+    with _lock_memoria:
+        if _sessoes_memoria == 0 and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            _ligado_aqui = True
+        _sessoes_memoria += 1
+
+
+def _desligar_memoria():
+    global _sessoes_memoria, _ligado_aqui
+    with _lock_memoria:
+        _sessoes_memoria -= 1
+        if _sessoes_memoria == 0 and _ligado_aqui:
+            tracemalloc.stop()
+            _ligado_aqui = False
+
+
+class _Medicao:
+    def __init__(self, perfil, nome):
+        self.perfil = perfil
+        self.nome = nome
+        self.linhas = 0
+        self.bytes = 0
+
+    # 🧮 Acrescenta o tamanho do que a etapa produziu
+    def registrar(self, dados=None, linhas=0, bytes=0):
+        linhas_dados, bytes_dados = tamanho(dados)
+        self.linhas += linhas + linhas_dados
+        self.bytes += bytes + bytes_dados
+        return dados
+
+    def __enter__(self):
+        if self.perfil.memoria:
+            tracemalloc.reset_peak()
+            self._memoria_inicial = tracemalloc.get_traced_memory()[0]
+        self._inicio = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        fim = time.perf_counter()
+        alocado = None
+        if self.perfil.memoria:
+            # Com outras sessões medindo ao mesmo tempo, o pico também inclui o que elas alocaram
+            alocado = max(tracemalloc.get_traced_memory()[1] - self._memoria_inicial, 0)
+        self.perfil._anotar({
+            "etapa": self.nome,
+            "inicio_ms": (self._inicio - self.perfil.inicio) * 1000,
+            "duracao_ms": (fim - self._inicio) * 1000,
+            "linhas": self.linhas,
+            "bytes": self.bytes,
+            "alocado": alocado,
+            "thread": threading.get_ident(),
+        })
+        return False
+
+
+# ⏱️ Cronômetro por etapa de uma execução; desligado, `etapa()` devolve sempre o mesmo contexto vazio
+class Perfil:
+    def __init__(self, ativo=False, memoria=False, pagina=""):
+        self.ativo = ativo
+        self.memoria = ativo and memoria
+        self.pagina = pagina
+        self.inicio = time.perf_counter()
+        self.registros = []
+        self._lock = threading.Lock()
+        self._liberar = None
+        if self.memoria:
+            _ligar_memoria()
+            # Uma execução interrompida por exceção também devolve a sua parte quando o perfil é descartado
+            self._liberar = weakref.finalize(self, _desligar_memoria)
+
+    def etapa(self, nome):
+        if not self.ativo:
+            return _DESLIGADO
+        return _Medicao(self, nome)
+
+    def _anotar(self, registro):
+        with self._lock:
+            self.registros.append(registro)
+
+    # 🛑 Libera o tracemalloc (que deixa tudo mais lento) ao fim da execução; para de vez com a última sessão
+    def encerrar(self):
+        if self._liberar is not None:
+            self._liberar()
+        self.memoria = False
+
+    # 📊 Totais por etapa, na ordem de ETAPAS
+    def resumo(self):
+        with self._lock:
+            registros = list(self.registros)
+        totais = {}
+        for registro in registros:
+            total = totais.setdefault(registro["etapa"], {
+                "etapa": registro["etapa"], "chamadas": 0, "duracao_ms": 0.0, "linhas": 0, "bytes": 0, "alocado": None,
+            })
+            total["chamadas"] += 1
+            total["duracao_ms"] += registro["duracao_ms"]
+            total["linhas"] += registro["linhas"]
+            total["bytes"] += registro["bytes"]
+            if registro["alocado"] is not None:
+                total["alocado"] = max(total["alocado"] or 0, registro["alocado"])
+        ordem = {nome: posicao for posicao, nome in enumerate(ETAPAS)}
+        return sorted(totais.values(), key=lambda total: ordem.get(total["etapa"], len(ordem)))
+
+    # 📤 Trace no formato do Chrome/Perfetto (chrome://tracing, ui.perfetto.dev)
+    def para_json(self):
+        with self._lock:
+            registros = list(self.registros)
+        eventos = [
+            {
+                "name": registro["etapa"],
+                "cat": self.pagina,
+                "ph": "X",
+                "ts": registro["inicio_ms"] * 1000,
+                "dur": registro["duracao_ms"] * 1000,
+                "pid": os.getpid(),
+                "tid": registro["thread"],
+                "args": {chave: registro[chave] for chave in ("linhas", "bytes", "alocado")},
+            }
+            for registro in registros
+        ]
+        return json.dumps({"traceEvents": eventos, "displayTimeUnit": "ms"}, ensure_ascii=False)
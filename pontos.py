@@ -0,0 +1,36 @@
+import pandas as pd
+
+from normalizacao import COLUNAS_PONTUACAO
+
+
+# 🚦 O que fazer com representantes que têm pontos extras mas nenhuma venda no recorte
+MODOS_AUSENTES = ("descartar", "incluir")
+
+
+# ➕ Soma AÇÃO/PROMOÇÃO/INADIMPLÊNCIA por representante nos meses escolhidos
+def somar_pontos(pontos, meses=None):
+    if meses:
+        pontos = pontos[pontos["MÊS"].isin(meses)]
+    soma = pontos.groupby("REP.", observed=True)[COLUNAS_PONTUACAO].sum()
+    soma.index = soma.index.astype(str)
+    return soma
+
+
+# 🔗 Junta os pontos extras ao ranking de vendas em uma única passada
+def aplicar_pontos_extras(ranking, pontos, meses=None, ausentes="descartar"):
+    if ausentes not in MODOS_AUSENTES:
+        raise ValueError(f"Modo inválido para representantes sem venda: {ausentes!r}")
+
+    soma = somar_pontos(pontos, meses)
+    resultado = ranking.merge(soma, how="left", left_on="REP.", right_index=True)
+
+    if ausentes == "incluir":
+        sem_venda = soma.index.difference(pd.Index(ranking["REP."]), sort=False)
+        if len(sem_venda):
+            extras = soma.loc[sem_venda].rename_axis("REP.").reset_index()
+            extras["SUBTOTAL"] = 0.0
+            extras["PONTOS"] = 0
+            resultado = pd.concat([resultado, extras[resultado.columns]], ignore_index=True)
+
+    resultado[COLUNAS_PONTUACAO] = resultado[COLUNAS_PONTUACAO].fillna(0).astype(int)
+    return resultado.reset_index(drop=True)
@@ -1,24 +1,19 @@
 import streamlit as st
 import pandas as pd
-import locale
-import streamlit as st
-from io import BytesIO
-
 
-# 🧠 Configurar moeda brasileira
-try:
-    locale.setlocale(locale.LC_ALL, 'pt_BR.UTF-8')
-except locale.Error:
-    locale.setlocale(locale.LC_ALL, '')  # fallback para o padrão do sistema
-
-# 🔧 Função para limpar valores monetários
-def limpar_valor(valor):
-    if isinstance(valor, str):
-        valor = valor.replace("R$", "").replace(" ", "").replace(".", "").replace(",", ".")
-    try:
-        return float(valor)
-    except:
-        return None
+from armazem import ArmazemVendas
+from carregador import CarregadorPlanilha, url_aba
+from exportacao import MIME_XLSX, Aba, gerar_excel, gerar_relatorio_completo
+from formatacao import tabela_exibicao
+from livro_pontos import CAMINHO_LIVRO, LivroPontos
+import cubo as cubo_vendas
+from narrativas import Narrador
+from normalizacao import normalizar_pontos
+from paginacao import config_colunas, controles_pagina, estilos_destaque
+from perfil import Perfil
+from variacao import construir_painel
+from motor_ranking import TODOS_OS_MESES, classificacao, completar_ranking, medir_ganho, rankings_de_vendas
+from ranking_incremental import RankingIncremental, juntar_movimentos, movimentos_entre, tabela_movimentos
 
 # 🗂️ Inicializar sessão
 if "dados_vendas" not in st.session_state:
@@ -32,25 +27,163 @@ opcao = st.sidebar.radio("📌 NAVEGAÇÃO!", [
     "📈 Análise de Variação Anual"
 ])
 
+# 🔬 Profiler opcional: tempo, linhas e bytes por etapa desta execução (desligado não mede nada)
+with st.sidebar.expander("🔬 Profiler"):
+    perfil_ativo = st.toggle("Medir etapas desta página")
+    perfil_memoria = st.checkbox("Medir memória alocada (mais lento)", disabled=not perfil_ativo)
+    painel_perfil = st.empty()
+perfil = Perfil(perfil_ativo, perfil_memoria, opcao)
+
+def mostrar_perfil():
+    perfil.encerrar()
+    if not perfil.ativo:
+        return
+    with painel_perfil.container():
+        resumo = pd.DataFrame(perfil.resumo())
+        if not resumo.empty:
+            st.dataframe(resumo, hide_index=True)
+        st.download_button(
+            label="📥 Baixar trace (JSON)",
+            data=perfil.para_json,
+            file_name="trace_rankapp.json",
+            mime="application/json"
+        )
+
+# 🗄️ Snapshot local das vendas (Parquet por ANO), uma cópia somente leitura para todas as sessões
+@st.cache_resource
+def obter_armazem():
+    return ArmazemVendas()
+
+# 📡 Carregadores compartilhados entre todas as sessões (VENDAS só interpreta as linhas novas)
+@st.cache_resource
+def obter_carregadores():
+    return {
+        "vendas": CarregadorPlanilha(url_aba("VENDAS"), parser=obter_armazem().ingerir),
+        "pontos": CarregadorPlanilha(url_aba("PONTOS_EXTRAS")),
+    }
+
+# 🧹 Normalização feita uma única vez por versão da planilha (frame compartilhado e somente leitura)
+@st.cache_resource(max_entries=4)
+def pontos_normalizados(hash_conteudo, _bruto):
+    return normalizar_pontos(_bruto)
+
+# 🧊 Cubo agregado REP × ANO × MÊS × EMPRESA, construído uma vez por versão dos dados
+@st.cache_resource(max_entries=4)
+def cubo_agregado(versao, _vendas):
+    return cubo_vendas.construir_cubo(_vendas)
+
+# 📈 Vendas por mês/rep × ano para qualquer par de anos e séries de tendência, uma vez por versão
+@st.cache_resource(max_entries=4)
+def painel_variacao(versao, _cubo):
+    return construir_painel(_cubo)
+
+def versao_frame(df):
+    return str(pd.util.hash_pandas_object(df, index=False).sum())
+
+def obter_cubo():
+    if "versao_dados" not in st.session_state:
+        st.session_state["versao_dados"] = versao_frame(st.session_state["dados_vendas"])
+    return cubo_agregado(st.session_state["versao_dados"], st.session_state["dados_vendas"])
+
+def obter_painel():
+    cubo = obter_cubo()
+    return painel_variacao(st.session_state["versao_dados"], cubo)
+
+# 🗣️ Narrativas (e seus top/bottom N) memorizadas por snapshot, ano e filtros, compartilhadas entre sessões
+@st.cache_resource(max_entries=4)
+def narrador_em_cache(versao, _painel):
+    return Narrador(_painel)
+
+def obter_narrador():
+    painel = obter_painel()
+    return narrador_em_cache(st.session_state["versao_dados"], painel)
+
+# 📒 Livro de pontos extras compartilhado entre sessões e persistido em SQLite
+@st.cache_resource
+def obter_livro():
+    return LivroPontos(CAMINHO_LIVRO)
+
+# 📤 Planilhas geradas só quando alguém clica em baixar, guardadas pela chave (versão dos dados + filtros)
+@st.cache_data(max_entries=32, show_spinner=False)
+def excel_em_cache(chave, _montar_abas):
+    return gerar_excel(_montar_abas())
+
+@st.cache_data(max_entries=8, show_spinner=False)
+def relatorio_em_cache(chave, _montar_abas):
+    return gerar_relatorio_completo(_montar_abas())
+
+# ⚡ Parte de vendas de todos os rankings (ANO × EMPRESA × MÊS) em uma passada agrupada, só por versão das vendas:
+# incluir pontos não joga o cálculo fora, os pontos do livro entram na consulta
+@st.cache_resource(max_entries=4, show_spinner="Calculando todos os rankings...")
+def rankings_pre_calculados(versao_dados, _cubo):
+    return rankings_de_vendas(_cubo)
+
+# 🧷 Recalcula só quando as dependências mudam (memos é um dict guardado na sessão)
+def memorizar(memos, nome, dependencias, calcular):
+    guardado = memos.get(nome)
+    if guardado is None or guardado[0] != dependencias:
+        guardado = memos[nome] = (dependencias, calcular())
+    return guardado[1]
+
+# 📤 Geração de planilha medida como etapa de exportação
+def exportar(gerar, chave, montar_abas):
+    with perfil.etapa("exportacao") as medicao:
+        return medicao.registrar(gerar(chave, montar_abas))
+
+def livro_sincronizado():
+    livro = obter_livro()
+    if livro.versao[0] is None and "pontos_extras" in st.session_state:
+        if "versao_pontos" not in st.session_state:
+            st.session_state["versao_pontos"] = versao_frame(st.session_state["pontos_extras"])
+        livro.definir_base(st.session_state["versao_pontos"], st.session_state["pontos_extras"])
+    return livro
+
 # ID da planilha
 if opcao == "📤 Google Sheets":
     #st.title("📤 Carregando dados do Google Sheets")
 
-    sheet_id = "1n4C3ideu-g-xzVBJIdkyPo-8ewGH3wU1"
-    url_vendas = f"https://docs.google.com/spreadsheets/d/{sheet_id}/gviz/tq?tqx=out:csv&sheet=VENDAS"
-    url_pontos = f"https://docs.google.com/spreadsheets/d/{sheet_id}/gviz/tq?tqx=out:csv&sheet=PONTOS_EXTRAS"
+    carregadores = obter_carregadores()
 
-    try:
-        df = pd.read_csv(url_vendas)
-        pontos = pd.read_csv(url_pontos)
+    col_swr, col_recarga = st.columns(2)
+    with col_swr:
+        servir_cache = st.checkbox("⚡ Servir cache e atualizar em segundo plano", value=True)
+    with col_recarga:
+        forcar_recarga = st.button("🔄 Forçar recarga")
 
-        st.session_state["dados_vendas"] = df.copy()
-        st.session_state["pontos_extras"] = pontos.copy()
+    try:
+        with perfil.etapa("carga") as medicao:
+            snap_vendas = carregadores["vendas"].obter(forcar=forcar_recarga, stale_while_revalidate=servir_cache)
+            snap_pontos = carregadores["pontos"].obter(forcar=forcar_recarga, stale_while_revalidate=servir_cache)
+            medicao.registrar(snap_vendas.dados)
+            medicao.registrar(snap_pontos.dados)
+
+        st.session_state["dados_vendas"] = snap_vendas.dados
+        st.session_state["versao_dados"] = snap_vendas.hash_conteudo
+        with perfil.etapa("limpeza") as medicao:
+            st.session_state["pontos_extras"] = medicao.registrar(
+                pontos_normalizados(snap_pontos.hash_conteudo, snap_pontos.dados)
+            )
+        st.session_state["versao_pontos"] = snap_pontos.hash_conteudo
+        obter_livro().definir_base(snap_pontos.hash_conteudo, st.session_state["pontos_extras"])
 
         st.success("✅ Dados carregados diretamente do Google Sheets!")
+        st.caption(f"🕒 Última verificação há {snap_vendas.idade():.0f}s")
+        # A atualização em segundo plano não derruba a página: o erro fica no carregador e aparece aqui
+        for nome, carregador in carregadores.items():
+            if carregador.ultimo_erro is not None:
+                st.warning(
+                    f"⚠️ Não foi possível atualizar a aba {nome.upper()} ({carregador.ultimo_erro}); "
+                    f"exibindo a última versão carregada."
+                )
 
     except Exception as e:
         st.error(f"❌ Erro ao carregar dados do Google Sheets: {e}")
+        # Sem rede, as vendas do último snapshot local continuam disponíveis
+        armazem = obter_armazem()
+        if armazem.versao is not None and st.session_state["dados_vendas"].empty:
+            st.session_state["dados_vendas"] = armazem.carregar()
+            st.session_state["versao_dados"] = armazem.versao
+            st.info("📦 Usando o último snapshot local das vendas.")
 
     # Exibir dados carregados e botão de limpar
     if not st.session_state["dados_vendas"].empty:
@@ -60,11 +193,16 @@ if opcao == "📤 Google Sheets":
             #st.success("Dados removidos com sucesso!")
             #st.stop()
 
-        with st.expander("📄 Visualizar dados carregados"):
-            st.dataframe(st.session_state["dados_vendas"][["REP.", "SUBTOTAL", "MÊS", "EMPRESA", "ANO"]])
+        with st.expander("📄 Visualizar dados carregados"), perfil.etapa("renderizacao") as medicao:
+            st.dataframe(medicao.registrar(st.session_state["dados_vendas"][["REP.", "SUBTOTAL", "MÊS", "EMPRESA", "ANO"]]))
 
         with st.expander("📌 Visualizar pontos extras"):
-            st.dataframe(st.session_state["pontos_extras"])
+            st.dataframe(livro_sincronizado().materializar())
+
+        quarentena = obter_armazem().quarentena
+        if not quarentena.empty:
+            with st.expander(f"🚫 Linhas de VENDAS em quarentena ({len(quarentena)})"):
+                st.dataframe(quarentena, hide_index=True)
 
 # 📊 Venda Geral
 elif opcao == "📊 Venda Geral":
@@ -75,101 +213,35 @@ elif opcao == "📊 Venda Geral":
     if df.empty:
         st.warning("Nenhum dado disponível. Faça o upload de um arquivo primeiro.")
     else:
-        # Limpar valores
-        df["SUBTOTAL"] = df["SUBTOTAL"].apply(limpar_valor)
-        df = df[df["SUBTOTAL"].notnull() & (df["SUBTOTAL"] > 0)]
+        with perfil.etapa("agregacao") as medicao:
+            cubo = medicao.registrar(obter_cubo())
 
         # Filtro por ano
-        anos_disponiveis = sorted(df["ANO"].dropna().unique())
+        anos_disponiveis = cubo_vendas.anos(cubo)
         ano_selecionado = st.selectbox("Filtrar por ano", options=anos_disponiveis, index=len(anos_disponiveis)-1)
 
+        # Criar tabela dinâmica a partir do cubo (ordenada por TOTAL GERAL, com linha TOTAL POR MÊS)
+        with perfil.etapa("agregacao") as medicao:
+            tabela_final = medicao.registrar(cubo_vendas.tabela_vendas_geral(cubo, ano_selecionado))
 
-        df_filtrado = df[df["ANO"] == ano_selecionado].copy()
-        df_filtrado["MÊS"] = df_filtrado["MÊS"].str[:3].str.upper()
-
-        # Ordem fixa dos meses
-        ordem_meses = ["JAN", "FEV", "MAR", "ABR", "MAI", "JUN",
-                       "JUL", "AGO", "SET", "OUT", "NOV", "DEZ"]
-
-        # Criar tabela dinâmica
-        tabela_dinamica = pd.pivot_table(
-            df_filtrado,
-            index="REP.",
-            columns="MÊS",
-            values="SUBTOTAL",
-            aggfunc="sum",
-            fill_value=0
-        )
-
-        tabela_dinamica = tabela_dinamica.reindex(columns=ordem_meses, fill_value=0)
-        tabela_dinamica["TOTAL GERAL"] = tabela_dinamica.sum(axis=1)
-
-        # Adicionar linha TOTAL POR MÊS
-        total_por_mes = tabela_dinamica.sum(axis=0)
-        tabela_dinamica.loc["TOTAL POR MÊS"] = total_por_mes
-
-        # Separar linha de total
-        linha_total = tabela_dinamica.loc[["TOTAL POR MÊS"]]
-        tabela_dinamica_sem_total = tabela_dinamica.drop(index="TOTAL POR MÊS")
-
-        # Ordenar por TOTAL GERAL
-        tabela_ordenada = tabela_dinamica_sem_total.sort_values(by="TOTAL GERAL", ascending=False)
-        tabela_final = pd.concat([tabela_ordenada, linha_total])
-
-        # Estilo visual
-        # Estilo visual
-        def destacar_total(val):
-            return ["font-weight: bold; background-color: #f0f0f0" if val.name == "TOTAL POR MÊS" else "" for _ in val]
-
-        # ✅ Formatação manual de moeda brasileira
-        tabela_formatada = (
-            tabela_final.style
-            .format(lambda x: f"R$ {x:,.2f}".replace(",", "v").replace(".", ",").replace("v", ".") if isinstance(x, (int, float)) else x)
-           # .apply(destacar_total, axis=1)
-        )
-
+        # ✅ Formatação de moeda brasileira só na hora de exibir, e só da página visível
+        colunas_moeda = list(tabela_final.columns)
         st.subheader(f"📋 Vendas por Mês - Ano {ano_selecionado}")
-        st.dataframe(tabela_formatada)
+        pagina = controles_pagina(tabela_final, "venda_geral", fixas=["TOTAL POR MÊS"])
+        with perfil.etapa("formatacao") as medicao:
+            tabela_formatada = medicao.registrar(tabela_exibicao(pagina.dados, colunas_moeda))
+        with perfil.etapa("renderizacao"):
+            st.dataframe(tabela_formatada, column_config=config_colunas(colunas_moeda))
 
         # ✅ Narrativa de desempenho por representante
         st.subheader("🗣️ Narrativa de Representantes")
 
-        # Ranking geral no ano selecionado
-        ranking_ano = df_filtrado.groupby("REP.")["SUBTOTAL"].sum().sort_values(ascending=False)
-        melhores = ranking_ano.head(5)
-        piores = ranking_ano.tail(5)
-
-        # Variação entre 2025 e 2024
-        if 2025 in anos_disponiveis and 2024 in anos_disponiveis:
-            vendas_2025 = df[df["ANO"] == 2025].groupby("REP.")["SUBTOTAL"].sum()
-            vendas_2024 = df[df["ANO"] == 2024].groupby("REP.")["SUBTOTAL"].sum()
-
-            comparativo = pd.DataFrame({
-                "2024": vendas_2024,
-                "2025": vendas_2025
-            }).fillna(0)
-
-            comparativo["VARIAÇÃO (%)"] = ((comparativo["2025"] - comparativo["2024"]) /
-                                           (comparativo["2024"].replace(0, 1))) * 100
-
-            variacoes = comparativo["VARIAÇÃO (%)"].sort_values(ascending=False)
-            top_crescimento = variacoes.head(5)
-            top_queda = variacoes.tail(5)
-
-            narrativa = f"""
-            <p style='font-size:16px'>
-            No ano de <strong>{ano_selecionado}</strong>, os 5 representantes com maior volume de vendas foram:<br>
-            <strong>{', '.join(melhores.index)}</strong>.<br><br>
-            Os 5 com menor desempenho foram:<br>
-            <strong>{', '.join(piores.index)}</strong>.<br><br>
-            Comparando 2025 com 2024:<br>
-            Os maiores crescimentos foram de <strong>{', '.join(top_crescimento.index)}</strong> — destaque para <strong>{top_crescimento.index[0]}</strong> com crescimento de <span style='color:green; font-weight:bold'>{top_crescimento.iloc[0]:.2f}%</span>.<br>
-            As maiores quedas foram de <strong>{', '.join(top_queda.index)}</strong> — destaque para <strong>{top_queda.index[0]}</strong> com queda de <span style='color:red; font-weight:bold'>{top_queda.iloc[0]:.2f}%</span>.
-            </p>
-            """
-            st.markdown(narrativa, unsafe_allow_html=True)
+        # Maiores/menores vendas do ano e variação contra o ano anterior com vendas
+        narrativa = obter_narrador().venda_geral(ano_selecionado)
+        if narrativa is not None:
+            st.markdown(narrativa.html, unsafe_allow_html=True)
         else:
-            st.info("Para gerar a narrativa de variação, é necessário que o arquivo contenha dados de 2024 e 2025.")
+            st.info(f"Para gerar a narrativa de variação, é necessário que o arquivo contenha dados de um ano anterior a {ano_selecionado}.")
 
 # 🏆 Classificação Geral
 elif opcao == "🏆 Classificação Geral":
@@ -180,251 +252,270 @@ elif opcao == "🏆 Classificação Geral":
     if df.empty:
         st.warning("Nenhum dado disponível. Faça o upload de um arquivo primeiro.")
     else:
-        # ✅ Corrigir nomes dos meses para manter formato do Excel
-        mes_map = {
-            "jan": "JANEIRO", "fev": "FEVEREIRO", "mar": "MARÇO", "abr": "ABRIL",
-            "mai": "MAIO", "jun": "JUNHO", "jul": "JULHO", "ago": "AGOSTO",
-            "set": "SETEMBRO", "out": "OUTUBRO", "nov": "NOVEMBRO", "dez": "DEZEMBRO"
-        }
-        df["MÊS"] = df["MÊS"].astype(str).str.strip().str.lower().map(mes_map).fillna(df["MÊS"])
-
-        df["SUBTOTAL"] = df["SUBTOTAL"].apply(limpar_valor)
-        df = df[df["SUBTOTAL"].notnull() & (df["SUBTOTAL"] > 0)]
+        with perfil.etapa("agregacao") as medicao:
+            cubo = medicao.registrar(obter_cubo())
 
         # 🎛️ Filtros
-        anos_disponiveis = sorted(df["ANO"].dropna().unique())
+        anos_disponiveis = cubo_vendas.anos(cubo)
         ano_selecionado = st.selectbox("Filtrar por ano", options=anos_disponiveis, index=len(anos_disponiveis)-1)
 
-        empresas_disponiveis = sorted(df["EMPRESA"].dropna().unique())
+        empresas_disponiveis = cubo_vendas.empresas(cubo)
         empresa_selecionada = st.selectbox("Filtrar por empresa", options=["Todas"] + empresas_disponiveis)
 
-        meses_disponiveis = sorted(df["MÊS"].dropna().unique())
+        meses_disponiveis = cubo_vendas.meses(cubo)
         meses_selecionados = st.multiselect("Filtrar por mês", options=meses_disponiveis)
 
-        # Aplicar filtros
-        df_filtrado = df[df["ANO"] == ano_selecionado]
-        if empresa_selecionada != "Todas":
-            df_filtrado = df_filtrado[df_filtrado["EMPRESA"] == empresa_selecionada]
-        if meses_selecionados:
-            df_filtrado = df_filtrado[df_filtrado["MÊS"].isin(meses_selecionados)]
+        opcoes_ausentes = {"Ignorar": "descartar", "Incluir com venda zero": "incluir"}
+        modo_ausentes = opcoes_ausentes[st.radio(
+            "Representantes com pontos extras e sem venda", options=list(opcoes_ausentes), horizontal=True
+        )]
 
-        # 🏆 Ranking com pontos
-        ranking = df_filtrado.groupby("REP.")["SUBTOTAL"].sum().sort_values(ascending=False).reset_index()
-        if ranking.empty:
+        # 🏆 Sem venda no recorte escolhido não há ranking
+        with perfil.etapa("filtro") as medicao:
+            fatia = medicao.registrar(cubo_vendas.fatiar(cubo, ano_selecionado, empresa_selecionada, meses_selecionados))
+        if fatia.empty:
             st.warning("⚠️ Mês sem dados de venda.")
+            mostrar_perfil()
             st.stop()
-        # Calcular pontos com base na posição
-        multiplicadores = [5, 4, 3, 2] + [1] * (len(ranking) - 4)
-        ranking["PONTOS"] = (ranking["SUBTOTAL"] / 20000 * pd.Series(multiplicadores)).round().astype(int)
-
-        # Formatando SUBTOTAL como moeda brasileira
-        ranking["SUBTOTAL"] = ranking["SUBTOTAL"].apply(lambda x: f"R$ {x:,.2f}".replace(",", "v").replace(".", ",").replace("v", "."))
-
-        # 🔧 Campos para adicionar ou desfazer pontos extras
-        st.markdown("### ➕ Gerenciar Pontos Extras por Representante")
-
-        rep_input = st.text_input("Nome do Representante").strip()
-        mes_input = st.selectbox("Mês da Pontuação", options=meses_disponiveis)
-        acao_pontos = st.number_input("Pontos por Ação", min_value=0, step=1)
-        promo_pontos = st.number_input("Pontos por Promoção", min_value=0, step=1)
-        inad_pontos = st.number_input("Pontos por Inadimplência", min_value=0, step=1)
-
-        # Criar ou recuperar DataFrame de pontos extras acumulativos
-        if "pontos_extras" not in st.session_state:
-            st.session_state["pontos_extras"] = pd.DataFrame(columns=["REP.", "MÊS", "AÇÃO", "PROMOÇÃO", "INADIMPLÊNCIA"])
-
-        # Botões de ação
-        col1, col2 = st.columns(2)
-        with col1:
-            if st.button("✅ Incluir Pontos"):
-                if rep_input and mes_input:
-                    existente = st.session_state["pontos_extras"][
-                        (st.session_state["pontos_extras"]["REP."] == rep_input) &
-                        (st.session_state["pontos_extras"]["MÊS"] == mes_input)
-                    ]
-                    if not existente.empty:
-                        idx = existente.index[0]
-                        st.session_state["pontos_extras"].loc[idx, "AÇÃO"] += acao_pontos
-                        st.session_state["pontos_extras"].loc[idx, "PROMOÇÃO"] += promo_pontos
-                        st.session_state["pontos_extras"].loc[idx, "INADIMPLÊNCIA"] += inad_pontos
-                    else:
-                        nova_linha = pd.DataFrame([{
-                            "REP.": rep_input,
-                            "MÊS": mes_input,
-                            "AÇÃO": acao_pontos,
-                            "PROMOÇÃO": promo_pontos,
-                            "INADIMPLÊNCIA": inad_pontos
-                        }])
-                        st.session_state["pontos_extras"] = pd.concat([st.session_state["pontos_extras"], nova_linha], ignore_index=True)
-
-        with col2:
-            if st.button("❌ Desfazer Pontos"):
-                if rep_input and mes_input:
-                    st.session_state["pontos_extras"] = st.session_state["pontos_extras"][
-                        ~((st.session_state["pontos_extras"]["REP."] == rep_input) &
-                          (st.session_state["pontos_extras"]["MÊS"] == mes_input))
-                    ]
-                    st.success(f"Pontos removidos para {rep_input} no mês {mes_input}")
-
-        # 📁 Exportar histórico de pontos extras
-        st.markdown("### 📤 Exportar Histórico de Pontos Extras")
-        if not st.session_state["pontos_extras"].empty:
-            buffer = BytesIO()
-            with pd.ExcelWriter(buffer, engine="xlsxwriter") as writer:
-                st.session_state["pontos_extras"].to_excel(writer, index=False, sheet_name="Histórico de Pontos")
+
+        # Livro de pontos extras (planilha + lançamentos feitos no app)
+        livro = livro_sincronizado()
+
+        # 🔧 Campos para adicionar ou desfazer pontos extras (digitar aqui só reexecuta este fragmento)
+        @st.fragment
+        def formulario_pontos():
+            st.markdown("### ➕ Gerenciar Pontos Extras por Representante")
+
+            rep_input = st.text_input("Nome do Representante").strip()
+            mes_input = st.selectbox("Mês da Pontuação", options=meses_disponiveis)
+            acao_pontos = st.number_input("Pontos por Ação", min_value=0, step=1)
+            promo_pontos = st.number_input("Pontos por Promoção", min_value=0, step=1)
+            inad_pontos = st.number_input("Pontos por Inadimplência", min_value=0, step=1)
+            autor_input = st.text_input("Responsável pelo lançamento").strip()
+
+            # Botões de ação: o livro mudou, então ranking e exportações precisam ser refeitos
+            col1, col2 = st.columns(2)
+            with col1:
+                if st.button("✅ Incluir Pontos"):
+                    if rep_input and mes_input:
+                        livro.incluir(rep_input, mes_input, acao_pontos, promo_pontos, inad_pontos, autor_input)
+                        st.rerun(scope="app")
+
+            with col2:
+                if st.button("❌ Desfazer Pontos"):
+                    if rep_input and mes_input:
+                        livro.desfazer(rep_input, mes_input, autor_input)
+                        st.session_state["aviso_pontos"] = f"Pontos removidos para {rep_input} no mês {mes_input}"
+                        st.rerun(scope="app")
+                if "aviso_pontos" in st.session_state:
+                    st.success(st.session_state.pop("aviso_pontos"))
+
+        formulario_pontos()
+
+        with perfil.etapa("pontos") as medicao:
+            pontos_extras = medicao.registrar(livro.materializar())
+
+        # 🧷 Ranking guardado na sessão até alguma dependência mudar
+        # (versão das vendas, versão do livro ou filtros); o formulário de pontos não entra aqui
+        memos = st.session_state.setdefault("memos_classificacao", {})
+        filtro = (ano_selecionado, empresa_selecionada, tuple(meses_selecionados), modo_ausentes)
+        dependencias = (st.session_state["versao_dados"], livro.versao, *filtro)
+
+        # 🔀 Com o mesmo filtro, lançamentos novos no livro e vendas novas só reposicionam quem mudou;
+        # devolve None quando o filtro é novo. A estrutura incremental só é montada na primeira atualização
+        # com o filtro aberto (trocar de filtro continua sendo só uma consulta); aí, e quando a base de pontos
+        # da planilha muda, os movimentos saem da comparação com a tabela que estava na tela
+        def atualizar_incremental():
+            guardado = memos.get("incremental")
+            if guardado is None or guardado[0] != filtro or "ranking" not in memos:
+                return None
+            _, versao_vendas, incremental = guardado
+            movimentos = None if incremental is None else incremental.sincronizar_livro(livro, meses_selecionados)
+            if movimentos is None:
+                incremental = RankingIncremental.de_livro(
+                    cubo, livro, ano_selecionado, empresa_selecionada, meses_selecionados, modo_ausentes
+                )
+                tabela = incremental.tabela()
+                memos["incremental"] = (filtro, dependencias[0], incremental)
+                memos["movimentos"] = movimentos_entre(memos["ranking"][1], tabela)
+                return tabela
+            if versao_vendas != dependencias[0]:
+                movimentos = juntar_movimentos(movimentos + incremental.sincronizar_vendas(
+                    cubo_vendas.vendas_por_rep(cubo, *filtro[:3]).to_dict(),
+                    cubo_vendas.total_vendas(cubo, *filtro[:3])
+                ))
+            memos["incremental"] = (filtro, dependencias[0], incremental)
+            memos["movimentos"] = movimentos
+            return incremental.tabela()
+
+        def ranking_atual(pre_calcular=True):
+            def calcular():
+                ranking = atualizar_incremental()
+                if ranking is not None:
+                    return ranking
+                memos["incremental"] = (filtro, dependencias[0], None)
+                memos["movimentos"] = []
+                if pre_calcular and len(meses_selecionados) <= 1:
+                    rankings = rankings_pre_calculados(dependencias[0], cubo)
+                    mes_chave = meses_selecionados[0] if meses_selecionados else TODOS_OS_MESES
+                    pre_calculado = rankings.get((ano_selecionado, empresa_selecionada, mes_chave))
+                    if pre_calculado is not None:
+                        return completar_ranking(*pre_calculado, pontos_extras, meses_selecionados, modo_ausentes)
+                # Vários meses somados não estão entre as combinações pré-calculadas
+                return classificacao(
+                    cubo, pontos_extras, ano_selecionado, empresa_selecionada, meses_selecionados, modo_ausentes
+                )
+            return memorizar(memos, "ranking", dependencias, calcular)
+
+        # 📁 Exportar histórico de pontos extras (download não reexecuta a página)
+        @st.fragment
+        def exportar_historico():
+            st.markdown("### 📤 Exportar Histórico de Pontos Extras")
+            if not pontos_extras.empty:
+                def abas_pontos():
+                    return [Aba("Histórico de Pontos", pontos_extras), Aba("Lançamentos", livro.historico())]
+
+                st.download_button(
+                    label="📥 Baixar Histórico em Excel",
+                    data=lambda: exportar(excel_em_cache, ("pontos", livro.versao), abas_pontos),
+                    file_name="historico_pontos_extras.xlsx",
+                    mime=MIME_XLSX,
+                    on_click="ignore"
+                )
+            else:
+                st.info("Nenhum ponto extra registrado ainda.")
+
+        exportar_historico()
+
+        # 🏆 Ranking com pontos por posição, pontos extras, totais e medalhas (motor_ranking)
+        @st.fragment
+        def tabela_classificacao():
+            pre_calcular = st.checkbox(
+                "⚡ Pré-calcular todos os rankings (trocar de filtro vira uma consulta direta)", value=True
+            )
+            with perfil.etapa("pontos") as medicao:
+                ranking_final = medicao.registrar(ranking_atual(pre_calcular))
+
+            if st.button("⏱️ Medir ganho do cálculo agrupado"):
+                ganho = medir_ganho(cubo, pontos_extras, modo_ausentes)
+                st.caption(
+                    f"{ganho['combinacoes']} combinações: sequencial {ganho['tempo_sequencial']:.2f}s, "
+                    f"agrupado {ganho['tempo_agrupado']:.2f}s ({ganho['ganho']:.1f}x mais rápido)"
+                    + ("" if ganho["iguais"] else " ⚠️ resultados diferentes do cálculo sequencial")
+                )
+
+            # 📋 Exibir tabela
+            titulo = f"🏅 Classificação Geral - Ano {ano_selecionado}"
+            if empresa_selecionada != "Todas":
+                titulo += f" - {empresa_selecionada}"
+            if meses_selecionados:
+                titulo += " - Mês " + ", ".join(meses_selecionados)
+
+            # Busca, top N e paginação no servidor: o navegador recebe só a página visível + TOTAL GERAL
+            st.subheader(titulo)
+            pagina = controles_pagina(ranking_final, "classificacao", coluna="REP.", fixas=["TOTAL GERAL"])
+            with perfil.etapa("formatacao") as medicao:
+                ranking_formatado = medicao.registrar(tabela_exibicao(pagina.dados, ["SUBTOTAL"]))
+            with perfil.etapa("renderizacao"):
+                st.dataframe(
+                    ranking_formatado,
+                    use_container_width=True,
+                    hide_index=True,
+                    column_config=config_colunas(["SUBTOTAL"])
+                )
+
+            # ⬆️⬇️ Quem mudou de posição ou de pontos com a última atualização (livro ou vendas)
+            if memos.get("movimentos"):
+                with st.expander(f"🔀 Movimentações na última atualização ({len(memos['movimentos'])})"):
+                    st.dataframe(tabela_movimentos(memos["movimentos"]), use_container_width=True, hide_index=True)
+
+        tabela_classificacao()
+
+        # 📥 Exportações da classificação: geradas só no clique, pela mesma chave de dependências
+        @st.fragment
+        def exportar_classificacao():
+            st.markdown("### 📥 Exportar Tabela de Classificação Geral")
             st.download_button(
-                label="📥 Baixar Histórico em Excel",
-                data=buffer.getvalue(),
-                file_name="historico_pontos_extras.xlsx",
-                mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+                label="📥 Baixar Tabela de Classificação",
+                data=lambda: exportar(
+                    excel_em_cache, ("classificacao", *dependencias),
+                    lambda: [Aba("Classificação Geral", ranking_atual(), ("SUBTOTAL",))]
+                ),
+                file_name="classificacao_geral.xlsx",
+                mime=MIME_XLSX,
+                on_click="ignore"
             )
-        else:
-            st.info("Nenhum ponto extra registrado ainda.")
-        
-        # Filtrar pontos extras para os meses selecionados
-        pontos_mes = st.session_state["pontos_extras"]
-        if meses_selecionados:
-            pontos_mes = pontos_mes[pontos_mes["MÊS"].isin(meses_selecionados)]
-
-        # Inicializar colunas extras
-        ranking["AÇÃO"] = 0
-        ranking["PROMOÇÃO"] = 0
-        ranking["INADIMPLÊNCIA"] = 0
-
-        # Aplicar pontos extras por representante
-        for _, linha in pontos_mes.iterrows():
-            idx = ranking[ranking["REP."] == linha["REP."]].index
-            if not idx.empty:
-                ranking.loc[idx, "AÇÃO"] += linha["AÇÃO"]
-                ranking.loc[idx, "PROMOÇÃO"] += linha["PROMOÇÃO"]
-                ranking.loc[idx, "INADIMPLÊNCIA"] += linha["INADIMPLÊNCIA"]
-
-        # Calcular total de pontos
-        ranking["TOTAL DE PONTOS"] = ranking["PONTOS"] + ranking["AÇÃO"] + ranking["PROMOÇÃO"] + ranking["INADIMPLÊNCIA"]
-
-        # Calcular totais simples por coluna
-        total_subtotal_valor = df_filtrado["SUBTOTAL"].sum()
-        total_pontos = ranking["PONTOS"].sum()
-        total_acao = ranking["AÇÃO"].sum()
-        total_promocao = ranking["PROMOÇÃO"].sum()
-        total_inad = ranking["INADIMPLÊNCIA"].sum()
-        total_geral = ranking["TOTAL DE PONTOS"].sum()
-
-        linha_total = pd.DataFrame({
-            "REP.": ["TOTAL GERAL"],
-            "SUBTOTAL": [f"R$ {total_subtotal_valor:,.2f}".replace(",", "v").replace(".", ",").replace("v", ".")],
-            "PONTOS": [total_pontos],
-            "AÇÃO": [total_acao],
-            "PROMOÇÃO": [total_promocao],
-            "INADIMPLÊNCIA": [total_inad],
-            "TOTAL DE PONTOS": [total_geral]
-        })
-
-        # Concatenar ranking com linha de total
-        ranking_final = pd.concat([ranking, linha_total], ignore_index=True)
-
-        # Adicionar coluna de posição
-        medalhas = ["🥇", "🥈", "🥉", "🏅", "🏅"]
-        posicoes = [medalhas[i] if i < 5 else f"{i+1}º" for i in range(len(ranking))]
-        posicoes.append("🔢")  # Para TOTAL GERAL
-        ranking_final.insert(0, "POSIÇÃO", posicoes)
-
-        # 📋 Exibir tabela
-        titulo = f"🏅 Classificação Geral - Ano {ano_selecionado}"
-        if empresa_selecionada != "Todas":
-            titulo += f" - {empresa_selecionada}"
-        if meses_selecionados:
-            titulo += " - Mês " + ", ".join(meses_selecionados)
-
-        st.subheader(titulo)
-        st.dataframe(ranking_final, use_container_width=True, hide_index=True)
-                # 📥 Exportar Tabela de Classificação Geral (logo abaixo do histórico)
-        st.markdown("### 📥 Exportar Tabela de Classificação Geral")
-        buffer_tabela = BytesIO()
-        with pd.ExcelWriter(buffer_tabela, engine="xlsxwriter") as writer:
-            ranking_final.to_excel(writer, index=False, sheet_name="Classificação Geral")
-        st.download_button(
-            label="📥 Baixar Tabela de Classificação",
-            data=buffer_tabela.getvalue(),
-            file_name="classificacao_geral.xlsx",
-            mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
-        )
+
+            # 📚 Relatório completo: tabela dinâmica, classificação, comparativo anual e pontos
+            def abas_relatorio():
+                # O índice perde o nome no concat da linha de total; sem nome a aba ganharia um cabeçalho "index"
+                tabela_vendas = cubo_vendas.tabela_vendas_geral(cubo, ano_selecionado).rename_axis("REP.")
+                abas = [
+                    Aba("Vendas por Mês", tabela_vendas, tuple(tabela_vendas.columns), index=True),
+                    Aba("Classificação Geral", ranking_atual(), ("SUBTOTAL",)),
+                ]
+                if ano_selecionado - 1 in anos_disponiveis:
+                    comparativo = painel.comparar_meses(ano_selecionado - 1, ano_selecionado).rename_axis("MÊS")
+                    abas.append(Aba(
+                        "Comparativo Anual", comparativo,
+                        (str(ano_selecionado - 1), str(ano_selecionado), "TOTAL GERAL"), ("VARIAÇÃO (%)",), index=True
+                    ))
+                abas += [Aba("Pontos Extras", pontos_extras), Aba("Lançamentos", livro.historico())]
+                return abas
+
+            painel = obter_painel()
+            st.download_button(
+                label="📚 Baixar Relatório Completo",
+                data=lambda: exportar(relatorio_em_cache, ("relatorio", *dependencias), abas_relatorio),
+                file_name=f"relatorio_completo_{ano_selecionado}.xlsx",
+                mime=MIME_XLSX,
+                on_click="ignore"
+            )
+
+        exportar_classificacao()
 # 📈 Análise de Variação Anual
 elif opcao == "📈 Análise de Variação Anual":
-    st.title("📈 Análise de Variação entre 2024 e 2025")
-
     df = st.session_state["dados_vendas"]
 
     if df.empty or "ANO" not in df.columns:
+        st.title("📈 Análise de Variação Anual")
         st.warning("Dados insuficientes. Certifique-se de que o arquivo contém a coluna 'ANO'.")
+    elif len(obter_painel().anos) < 2:
+        st.title("📈 Análise de Variação Anual")
+        st.info("Para comparar anos, é necessário que o arquivo contenha dados de pelo menos dois anos.")
     else:
-        # Limpar e preparar dados
-        df["SUBTOTAL"] = df["SUBTOTAL"].apply(limpar_valor)
-        df = df[df["SUBTOTAL"].notnull() & (df["SUBTOTAL"] > 0)]
-        df["MÊS"] = df["MÊS"].str[:3].str.upper()
-
-        # Agrupar por mês e ano
-        vendas_2024 = df[df["ANO"] == 2024].groupby("MÊS")["SUBTOTAL"].sum()
-        vendas_2025 = df[df["ANO"] == 2025].groupby("MÊS")["SUBTOTAL"].sum()
-
-        # Criar DataFrame comparativo
-        comparativo = pd.DataFrame({
-            "2024": vendas_2024,
-            "2025": vendas_2025
-        }).fillna(0)
-
-        # ✅ Reordenar meses na ordem cronológica
-        ordem_meses = ["JAN", "FEV", "MAR", "ABR", "MAI", "JUN",
-                       "JUL", "AGO", "SET", "OUT", "NOV", "DEZ"]
-        comparativo = comparativo.reindex(ordem_meses)
-
-        # ✅ Adicionar coluna TOTAL GERAL por mês
-        comparativo["TOTAL GERAL"] = comparativo["2024"] + comparativo["2025"]
-
-        # Calcular variação percentual por mês
-        comparativo["VARIAÇÃO (%)"] = ((comparativo["2025"] - comparativo["2024"]) /
-                                       (comparativo["2024"].replace(0, 1))) * 100
-
-        # ✅ Calcular variação total anual separadamente
-        soma_2024 = comparativo.loc[ordem_meses, "2024"].sum()
-        soma_2025 = comparativo.loc[ordem_meses, "2025"].sum()
-        variacao_total = (soma_2025 - soma_2024) / (soma_2024 if soma_2024 != 0 else 1) * 100
-
-        # ✅ Adicionar linha TOTAL GERAL no final
-        linha_total = pd.DataFrame(comparativo.loc[ordem_meses].sum(numeric_only=True)).T
-        linha_total.index = ["TOTAL GERAL"]
-        linha_total["VARIAÇÃO (%)"] = variacao_total
-        comparativo = pd.concat([comparativo, linha_total])
-
-        # Identificar melhores e piores meses (excluindo a linha TOTAL GERAL)
-        comparativo_sem_total = comparativo.drop(index="TOTAL GERAL")
-        melhores = comparativo_sem_total.sort_values("VARIAÇÃO (%)", ascending=False).head(3)
-        piores = comparativo_sem_total.sort_values("VARIAÇÃO (%)").head(3)
-
-        # ✅ Estilo visual da tabela
-        def destacar_total(val):
-            return ["font-weight: bold; background-color: #f0f0f0" if val.name == "TOTAL GERAL" else "" for _ in val]
-
-        def destacar_variacao(val):
-            if isinstance(val, (int, float)):
-                if val > 0:
-                    return "color: green; font-weight: bold"
-                elif val < 0:
-                    return "color: red; font-weight: bold"
-            return ""
-
-        # ✅ Aplicar estilos e centralizar cabeçalhos
+        with perfil.etapa("agregacao"):
+            painel = obter_painel()
+
+        # Título reservado acima dos seletores e preenchido depois que o par de anos é escolhido
+        titulo = st.empty()
+
+        # 🎛️ Par de anos (padrão: os dois mais recentes)
+        col_base, col_comparado = st.columns(2)
+        with col_base:
+            ano_base = st.selectbox("Ano base", options=painel.anos[:-1], index=len(painel.anos) - 2)
+        with col_comparado:
+            anos_comparaveis = [ano for ano in painel.anos if ano > ano_base]
+            ano_comparado = st.selectbox("Ano comparado", options=anos_comparaveis, index=len(anos_comparaveis) - 1)
+
+        titulo.title(f"📈 Análise de Variação entre {ano_base} e {ano_comparado}")
+        base, comparado = str(ano_base), str(ano_comparado)
+
+        # Comparativo mês a mês entre os dois anos, com linha TOTAL GERAL no final
+        with perfil.etapa("agregacao") as medicao:
+            comparativo = medicao.registrar(painel.comparar_meses(ano_base, ano_comparado))
+
+        # ✅ Estilo visual da tabela (máscaras calculadas em bloco sobre os valores numéricos)
+        estilos = estilos_destaque(comparativo, ["TOTAL GERAL"], ["VARIAÇÃO (%)"])
+
+        # ✅ Formatar só para exibição, aplicar estilos e centralizar cabeçalhos
+        with perfil.etapa("formatacao") as medicao:
+            comparativo_formatado = medicao.registrar(
+                tabela_exibicao(comparativo, [base, comparado, "TOTAL GERAL"], ["VARIAÇÃO (%)"])
+            )
         comparativo_styled = (
-        comparativo.style
-        .format({
-            "2024": lambda x: f"R$ {x:,.2f}".replace(",", "v").replace(".", ",").replace("v", "."),
-            "2025": lambda x: f"R$ {x:,.2f}".replace(",", "v").replace(".", ",").replace("v", "."),
-            "TOTAL GERAL": lambda x: f"R$ {x:,.2f}".replace(",", "v").replace(".", ",").replace("v", "."),
-            "VARIAÇÃO (%)": lambda x: f"{x:.2f}%"
-        })
-
-        .apply(destacar_total, axis=1)
-        .applymap(destacar_variacao, subset=["VARIAÇÃO (%)"])
+        comparativo_formatado.style
+        .apply(lambda _: estilos, axis=None)
         .set_table_styles([
             {"selector": "th", "props": [("text-align", "center")]},
             {"selector": "thead th", "props": [("text-align", "center")]}
@@ -433,27 +524,21 @@ elif opcao == "📈 Análise de Variação Anual":
          )
 
         st.subheader("📊 Comparativo de Vendas por Ano")
-        st.dataframe(comparativo_styled)
-
-        # ✅ Função para destacar variação na narrativa
-        def formatar_variacao_html(valor):
-            cor = "green" if valor > 0 else "red" if valor < 0 else "black"
-            return f"<span style='color:{cor}; font-weight:bold'>{valor:.2f}%</span>"
-
-        # Gerar valores formatados com cor
-        variacao_total_html = formatar_variacao_html(variacao_total)
-        melhor_mes = melhores.index[0]
-        melhor_valor_html = formatar_variacao_html(melhores.iloc[0]["VARIAÇÃO (%)"])
-        pior_mes = piores.index[0]
-        pior_valor_html = formatar_variacao_html(piores.iloc[0]["VARIAÇÃO (%)"])
-
-        # ✅ Narrativa com destaque visual
-        narrativa_html = f"""
-        <p style='font-size:16px'>
-        Em 2025, as vendas apresentaram uma variação total de {variacao_total_html}em relação ano de 2024.<br>
-        Os meses com maior crescimento foram: <strong>{', '.join(melhores.index)}</strong> — com destaque para <strong>{melhor_mes}</strong>, que cresceu {melhor_valor_html}<br>
-        Já os meses com pior desempenho foram: <strong>{', '.join(piores.index)}</strong> — sendo <strong>{pior_mes}</strong> o mais crítico, com queda de {pior_valor_html}.
-        </p>
-        """
+        with perfil.etapa("renderizacao"):
+            st.dataframe(comparativo_styled)
+
+        # ✅ Narrativa com destaque visual (melhores e piores meses)
         st.subheader("🗣️ Narrativa de Desempenho Anual")
-        st.markdown(narrativa_html, unsafe_allow_html=True)
+        st.markdown(obter_narrador().variacao_anual(ano_base, ano_comparado).html, unsafe_allow_html=True)
+
+        # 📉 Tendência de todos os anos (mesmo painel, sem reprocessar as vendas)
+        st.subheader("📉 Tendência entre Anos")
+        st.line_chart(painel.tendencia_mensal())
+        serie = painel.serie_anual()
+        st.dataframe(
+            tabela_exibicao(serie, ["TOTAL"], ["VARIAÇÃO (%)"]),
+            column_config=config_colunas(["TOTAL"], ["VARIAÇÃO (%)"])
+        )
+
+# 🔬 Resultado do profiler desta execução
+mostrar_perfil()
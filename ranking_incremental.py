@@ -0,0 +1,329 @@
+import bisect
+from dataclasses import dataclass
+from typing import Optional
+
+import pandas as pd
+
+import cubo as cubo_vendas
+from motor_ranking import COLUNAS_RANKING, DIVISOR_PONTOS, MULTIPLICADORES_TOPO, adicionar_totais
+from normalizacao import MESES
+from pontos import MODOS_AUSENTES, somar_pontos
+
+
+SEM_PONTOS = (0, 0, 0)
+# Acima disso, um snapshot novo das vendas reconstrói a ordem e compara as posições numa passada só
+LIMITE_INCREMENTAL = 20
+
+
+# 🔀 Mudança de um representante entre duas versões do ranking (posições começam em 1; None = fora do ranking)
+@dataclass(frozen=True)
+class Movimento:
+    rep: str
+    antes: Optional[int]
+    depois: Optional[int]
+    total_antes: int
+    total_depois: int
+
+    # ⬆️ Positivo = subiu, negativo = caiu
+    @property
+    def variacao(self):
+        if self.antes is None or self.depois is None:
+            return 0
+        return self.antes - self.depois
+
+
+def _multiplicador(posicao):
+    return MULTIPLICADORES_TOPO[posicao] if posicao < len(MULTIPLICADORES_TOPO) else 1
+
+
+# 🏎️ Ranking mantido incrementalmente: lista ordenada por (-SUBTOTAL, REP.) com busca binária
+class RankingIncremental:
+    def __init__(self, vendas, extras=None, total=None, ausentes="descartar"):
+        if ausentes not in MODOS_AUSENTES:
+            raise ValueError(f"Modo inválido para representantes sem venda: {ausentes!r}")
+        self.ausentes = ausentes
+        self._extras = {rep: tuple(int(v) for v in valores) for rep, valores in (extras or {}).items()}
+        self._montar(vendas, total)
+        self.versao_livro = None
+
+    def _montar(self, vendas, total):
+        self._subtotal = {rep: float(valor) for rep, valor in vendas.items() if valor > 0}
+        self._ordem = sorted((-valor, rep) for rep, valor in self._subtotal.items())
+        self._sem_venda = sorted(rep for rep in self._extras if rep not in self._subtotal)
+        # Vendas sem REP. entram no TOTAL GERAL mas não no ranking
+        self._fora_do_ranking = 0.0 if total is None else total - sum(self._subtotal.values())
+        self._pontos = {rep: self._pontos_na_posicao(posicao) for posicao, (_, rep) in enumerate(self._ordem)}
+
+    # 🧊 Mesmo recorte da Classificação Geral, a partir do cubo
+    @classmethod
+    def de_cubo(cls, cubo, pontos, ano, empresa="Todas", meses=None, ausentes="descartar"):
+        vendas = cubo_vendas.vendas_por_rep(cubo, ano, empresa, meses)
+        soma = somar_pontos(pontos, meses)
+        extras = dict(zip(soma.index, map(tuple, soma.to_numpy())))
+        return cls(vendas.to_dict(), extras, cubo_vendas.total_vendas(cubo, ano, empresa, meses), ausentes)
+
+    # 📒 Idem, com os pontos do livro; guarda a versão do livro para aplicar só os lançamentos seguintes
+    @classmethod
+    def de_livro(cls, cubo, livro, ano, empresa="Todas", meses=None, ausentes="descartar"):
+        versao = livro.versao
+        ranking = cls.de_cubo(cubo, livro.materializar(), ano, empresa, meses, ausentes)
+        ranking.versao_livro = versao
+        return ranking
+
+    def __len__(self):
+        return len(self._ordem) + (len(self._sem_venda) if self.ausentes == "incluir" else 0)
+
+    def _pontos_na_posicao(self, posicao):
+        valor, _ = self._ordem[posicao]
+        return round(-valor / DIVISOR_PONTOS * _multiplicador(posicao))
+
+    def _indice(self, rep):
+        if rep in self._subtotal:
+            return bisect.bisect_left(self._ordem, (-self._subtotal[rep], rep))
+        return None
+
+    # 🔢 Posição (1, 2, ...) de um representante, ou None se ele não aparece no ranking
+    def posicao(self, rep):
+        indice = self._indice(rep)
+        if indice is not None:
+            return indice + 1
+        if self.ausentes == "incluir" and rep in self._extras:
+            return len(self._ordem) + bisect.bisect_left(self._sem_venda, rep) + 1
+        return None
+
+    def total_de_pontos(self, rep):
+        if self.posicao(rep) is None:
+            return 0
+        return self._pontos.get(rep, 0) + sum(self._extras.get(rep, SEM_PONTOS))
+
+    # 📸 (posição, total de pontos) de quem está do índice `de` da ordem para baixo (e dos sem venda no
+    # modo "incluir"), contando as posições numa passada só; quem fica acima de `de` não muda
+    def _foto(self, de=0):
+        foto = {
+            rep: (posicao, self._pontos[rep] + sum(self._extras.get(rep, SEM_PONTOS)))
+            for posicao, (_, rep) in enumerate(self._ordem[de:], de + 1)
+        }
+        if self.ausentes == "incluir":
+            foto.update(
+                (rep, (posicao, sum(self._extras[rep])))
+                for posicao, rep in enumerate(self._sem_venda, len(self._ordem) + 1)
+            )
+        return foto
+
+    # ✖️ Só o topo tem multiplicador diferente de 1: recalcula essas posições e a primeira logo abaixo
+    # (quem acabou de sair do topo); o resto só muda de posição, não de PONTOS
+    def _recalcular_topo(self, de, ate):
+        limite = len(MULTIPLICADORES_TOPO) + 1
+        for posicao in range(min(de, limite), min(ate + 1, limite, len(self._ordem))):
+            self._pontos[self._ordem[posicao][1]] = self._pontos_na_posicao(posicao)
+
+    # 💰 Novo SUBTOTAL de um representante: busca binária para sair e entrar na ordem
+    def atualizar_venda(self, rep, subtotal):
+        subtotal = float(subtotal)
+        anterior = self._indice(rep)
+        if anterior is not None and subtotal > 0:
+            return self._mover(rep, anterior, subtotal)
+
+        # Entrar ou sair da ordem desloca todo mundo abaixo (e os sem venda, no modo "incluir")
+        inicio = anterior if anterior is not None else len(self._ordem)
+        de = min(inicio, bisect.bisect_left(self._ordem, (-subtotal, rep))) if subtotal > 0 else inicio
+        antes = self._foto(de)
+
+        if anterior is not None:
+            del self._ordem[anterior]
+            del self._subtotal[rep]
+            self._pontos.pop(rep, None)
+        elif rep in self._extras:
+            del self._sem_venda[bisect.bisect_left(self._sem_venda, rep)]
+
+        if subtotal > 0:
+            self._subtotal[rep] = subtotal
+            indice = bisect.bisect_left(self._ordem, (-subtotal, rep))
+            self._ordem.insert(indice, (-subtotal, rep))
+            self._pontos[rep] = self._pontos_na_posicao(indice)
+        else:
+            indice = len(self._ordem)
+            if rep in self._extras:
+                bisect.insort(self._sem_venda, rep)
+
+        self._recalcular_topo(min(inicio, indice), max(inicio, indice))
+        return diferenca(antes, self._foto(de))
+
+    # ↕️ Rep que continua vendendo: só quem está entre a posição antiga e a nova anda uma casa
+    def _mover(self, rep, anterior, subtotal):
+        limite = len(MULTIPLICADORES_TOPO) + 1
+        pontos_antes = {r: self._pontos[r] for _, r in self._ordem[:limite]}
+        pontos_antes[rep] = self._pontos[rep]
+
+        del self._ordem[anterior]
+        self._subtotal[rep] = subtotal
+        indice = bisect.bisect_left(self._ordem, (-subtotal, rep))
+        self._ordem.insert(indice, (-subtotal, rep))
+        self._pontos[rep] = self._pontos_na_posicao(indice)
+        self._recalcular_topo(min(anterior, indice), max(anterior, indice))
+
+        # (rep, posição antes, posição depois), já na ordem nova
+        if indice < anterior:
+            andaram = [(r, k, k + 1) for k, (_, r) in enumerate(self._ordem[indice + 1:anterior + 1], indice + 1)]
+        else:
+            andaram = [(r, k + 2, k + 1) for k, (_, r) in enumerate(self._ordem[anterior:indice], anterior)]
+        andaram.append((rep, anterior + 1, indice + 1))
+        andaram.sort(key=lambda item: item[2])
+
+        movimentos = []
+        for r, posicao_antes, posicao_depois in andaram:
+            extras = sum(self._extras.get(r, SEM_PONTOS))
+            total_antes = pontos_antes.get(r, self._pontos[r]) + extras
+            total_depois = self._pontos[r] + extras
+            if (posicao_antes, total_antes) != (posicao_depois, total_depois):
+                movimentos.append(Movimento(r, posicao_antes, posicao_depois, total_antes, total_depois))
+        return movimentos
+
+    # ➕ Novos pontos extras (AÇÃO, PROMOÇÃO, INADIMPLÊNCIA) de um representante; None = sem pontos
+    def atualizar_pontos(self, rep, valores):
+        no_ranking = rep in self._subtotal
+        if no_ranking:
+            # Só o total do próprio rep muda
+            posicao = self.posicao(rep)
+            antes = {rep: (posicao, self.total_de_pontos(rep))}
+        else:
+            inicio = len(self._ordem) + bisect.bisect_left(self._sem_venda, rep)
+            antes = self._foto(len(self._ordem))
+
+        tinha = rep in self._extras
+        if valores is None:
+            self._extras.pop(rep, None)
+            if tinha and not no_ranking:
+                del self._sem_venda[inicio - len(self._ordem)]
+        else:
+            self._extras[rep] = tuple(int(v) for v in valores)
+            if not tinha and not no_ranking:
+                bisect.insort(self._sem_venda, rep)
+        if no_ranking:
+            return diferenca(antes, {rep: (posicao, self.total_de_pontos(rep))})
+        return diferenca(antes, self._foto(len(self._ordem)))
+
+    # 🔄 Aplica as diferenças de vendas (novo snapshot) só para quem mudou; se muita gente mudou,
+    # reconstruir a ordem e comparar as posições de uma vez sai mais barato que um passo por rep
+    def sincronizar_vendas(self, vendas, total):
+        vendas = {rep: float(valor) for rep, valor in vendas.items() if valor > 0}
+        mudaram = [rep for rep in self._subtotal if rep not in vendas]
+        mudaram += [rep for rep, valor in vendas.items() if self._subtotal.get(rep) != valor]
+        if len(mudaram) > LIMITE_INCREMENTAL:
+            antes = self._foto()
+            self._montar(vendas, total)
+            return diferenca(antes, self._foto())
+
+        movimentos = []
+        for rep in mudaram:
+            movimentos += self.atualizar_venda(rep, vendas.get(rep, 0.0))
+        self._fora_do_ranking = total - sum(self._subtotal.values())
+        return juntar_movimentos(movimentos)
+
+    # 📒 Aplica só os lançamentos do livro feitos depois da última sincronização.
+    # Devolve None quando a base da planilha mudou: aí o ranking precisa ser reconstruído.
+    def sincronizar_livro(self, livro, meses=None):
+        base, aplicados = self.versao_livro
+        if livro.versao[0] != base:
+            return None
+        lancamentos = livro.lancamentos_desde(aplicados)
+        movimentos = []
+        for rep in dict.fromkeys(l.rep for l in lancamentos if not meses or l.mes in meses):
+            movimentos += self.atualizar_pontos(rep, pontos_do_livro(livro, rep, meses))
+        self.versao_livro = (base, aplicados + len(lancamentos))
+        return juntar_movimentos(movimentos)
+
+    # 📋 Mesma tabela de motor_ranking.classificacao (POSIÇÃO com medalhas e linha TOTAL GERAL)
+    def tabela(self):
+        if not self._ordem:
+            return pd.DataFrame(columns=COLUNAS_RANKING)
+        reps = [rep for _, rep in self._ordem]
+        if self.ausentes == "incluir":
+            reps += self._sem_venda
+        extras = [self._extras.get(rep, SEM_PONTOS) for rep in reps]
+        pontos = [self._pontos.get(rep, 0) for rep in reps]
+        ranking = pd.DataFrame({
+            "REP.": reps,
+            "SUBTOTAL": [self._subtotal.get(rep, 0.0) for rep in reps],
+            "PONTOS": pontos,
+            "AÇÃO": [e[0] for e in extras],
+            "PROMOÇÃO": [e[1] for e in extras],
+            "INADIMPLÊNCIA": [e[2] for e in extras],
+            "TOTAL DE PONTOS": [p + sum(e) for p, e in zip(pontos, extras)],
+        })
+        return adicionar_totais(ranking, sum(self._subtotal.values()) + self._fora_do_ranking)
+
+
+# 🔀 Movimentos entre duas fotos {rep: (posição, total)}; quem falta numa delas está fora do ranking
+def diferenca(antes, depois):
+    fora = (None, 0)
+    movimentos = []
+    for rep in antes.keys() | depois.keys():
+        de, para = antes.get(rep, fora), depois.get(rep, fora)
+        if de != para:
+            movimentos.append(Movimento(rep, de[0], para[0], de[1], para[1]))
+    return sorted(movimentos, key=lambda m: (m.depois is None, m.depois or 0, m.rep))
+
+
+# 📋 Foto de uma tabela da Classificação Geral (linhas na ordem do ranking, TOTAL GERAL por último)
+def foto_da_tabela(tabela):
+    if tabela.empty:
+        return {}
+    corpo = tabela.iloc[:-1]
+    return {
+        rep: (posicao, int(total))
+        for posicao, (rep, total) in enumerate(zip(corpo["REP."], corpo["TOTAL DE PONTOS"]), 1)
+    }
+
+
+# 🔀 Movimentos entre duas tabelas da Classificação Geral (por exemplo, antes e depois de reconstruir)
+def movimentos_entre(anterior, atual):
+    return diferenca(foto_da_tabela(anterior), foto_da_tabela(atual))
+
+
+# 🧮 Vários movimentos do mesmo rep viram um só (primeira posição antes, última depois)
+def juntar_movimentos(movimentos):
+    juntos = {}
+    for movimento in movimentos:
+        primeiro = juntos.get(movimento.rep, movimento)
+        juntos[movimento.rep] = Movimento(
+            movimento.rep, primeiro.antes, movimento.depois, primeiro.total_antes, movimento.total_depois
+        )
+    return sorted(
+        (
+            movimento for movimento in juntos.values()
+            if (movimento.antes, movimento.total_antes) != (movimento.depois, movimento.total_depois)
+        ),
+        key=lambda m: (m.depois is None, m.depois or 0, m.rep),
+    )
+
+
+# 📒 Pontos de um rep no livro somados nos meses do filtro (None se não tem nenhum lançamento diferente de zero)
+def pontos_do_livro(livro, rep, meses=None):
+    totais = [livro.consultar(rep, mes) for mes in (meses or MESES)]
+    totais = [valores for valores in totais if any(valores)]
+    if not totais:
+        return None
+    return tuple(sum(coluna) for coluna in zip(*totais))
+
+
+# 📋 Movimentos em tabela para exibir (⬆️ subiu, ⬇️ caiu, 🆕 entrou, ❌ saiu)
+def tabela_movimentos(movimentos):
+    def seta(movimento):
+        if movimento.antes is None:
+            return "🆕"
+        if movimento.depois is None:
+            return "❌"
+        if movimento.variacao > 0:
+            return f"⬆️ {movimento.variacao}"
+        if movimento.variacao < 0:
+            return f"⬇️ {-movimento.variacao}"
+        return "="
+
+    return pd.DataFrame(
+        [
+            (m.rep, seta(m), m.antes, m.depois, m.total_antes, m.total_depois)
+            for m in movimentos
+        ],
+        columns=["REP.", "MOVIMENTO", "POSIÇÃO ANTES", "POSIÇÃO AGORA", "PONTOS ANTES", "PONTOS AGORA"],
+    ).astype({"POSIÇÃO ANTES": "Int64", "POSIÇÃO AGORA": "Int64"})
@@ -0,0 +1,49 @@
+import numpy as np
+import pandas as pd
+
+from formatacao import formatar_brl
+from normalizacao import COLUNAS_PONTUACAO, MESES
+
+
+# ✍️ Jeitos diferentes de escrever o mesmo mês, como aparecem na planilha ("JANEIRO", "jan", "Janeiro", "JAN")
+GRAFIAS_MES = np.array(
+    [grafia for mes in MESES for grafia in (mes, mes[:3].lower(), mes.capitalize(), mes[:3])],
+    dtype=object,
+)
+EMPRESAS = ("ALFA", "BETA", "GAMA")
+
+
+def _reps(quantidade):
+    return np.array([f"REP {i:03d}" for i in range(quantidade)], dtype=object)
+
+
+# 🧪 Aba VENDAS com o esquema real: SUBTOTAL em texto "R$ 1.234,56", meses em grafias misturadas
+def gerar_vendas(linhas, anos=(2023, 2024, 2025), reps=50, empresas=EMPRESAS, zerados=0.01, semente=0):
+    gerador = np.random.default_rng(semente)
+    valores = np.round(gerador.lognormal(mean=8.5, sigma=1.2, size=linhas), 2)
+    valores[gerador.random(linhas) < zerados] = 0.0
+    meses = gerador.integers(0, len(MESES), linhas) * 4 + gerador.integers(0, 4, linhas)
+    return pd.DataFrame({
+        "REP.": _reps(reps)[gerador.integers(0, reps, linhas)],
+        "SUBTOTAL": formatar_brl(pd.Series(valores)).astype(object),
+        "MÊS": GRAFIAS_MES[meses],
+        "EMPRESA": np.array(empresas, dtype=object)[gerador.integers(0, len(empresas), linhas)],
+        "ANO": np.array(anos)[gerador.integers(0, len(anos), linhas)],
+    })
+
+
+# ➕ Aba PONTOS_EXTRAS (inclui representantes sem venda nenhuma)
+def gerar_pontos(linhas, reps=50, sem_venda=3, semente=0):
+    gerador = np.random.default_rng(semente + 1)
+    nomes = np.concatenate([_reps(reps), np.array([f"NOVO {i:02d}" for i in range(sem_venda)], dtype=object)])
+    meses = gerador.integers(0, len(MESES), linhas) * 4 + gerador.integers(0, 4, linhas)
+    return pd.DataFrame({
+        "REP.": nomes[gerador.integers(0, len(nomes), linhas)],
+        "MÊS": GRAFIAS_MES[meses],
+        **{coluna: gerador.integers(0, 6, linhas) for coluna in COLUNAS_PONTUACAO},
+    })
+
+
+# 📄 CSV no mesmo formato exportado pelo Google Sheets
+def para_csv(df):
+    return df.to_csv(index=False).encode("utf-8")
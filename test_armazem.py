@@ -0,0 +1,86 @@
+import pandas as pd
+import pytest
+
+import armazem
+from armazem import ArmazemVendas
+
+
+CABECALHO = "REP.,SUBTOTAL,MÊS,EMPRESA,ANO"
+LINHAS = [
+    "ANA,100,JAN,X,2023",
+    "BIA,abc,FEV,X,2024",
+    "CAU,300,MAR,Y,2024",
+    "DIA,400,ABR,X,2023",
+    "EVA,500,MAIO,Y,2024",
+    "FIA,600,XYZ,X,2024",
+    "GUI,700,JUN,X,2025",
+]
+
+
+def _csv(linhas, quebra="\n", final=True):
+    texto = quebra.join([CABECALHO, *linhas])
+    return (texto + quebra if final else texto).encode("utf-8")
+
+
+def _ordenado(df):
+    return df.astype({"REP.": str, "EMPRESA": str}).sort_values(["REP.", "ANO"]).reset_index(drop=True)
+
+
+@pytest.mark.parametrize("quebra", ["\n", "\r\n"])
+@pytest.mark.parametrize("final", [True, False])
+def test_acrescimo_igual_a_reconstrucao(tmp_path, quebra, final):
+    incremental = ArmazemVendas(tmp_path / "incremental", tamanho_bloco=2)
+    incremental.ingerir(_csv(LINHAS[:3], quebra, final))
+    antes = incremental.linhas_interpretadas
+    incremental.ingerir(_csv(LINHAS[:5], quebra, final))
+    incremental.ingerir(_csv(LINHAS, quebra, final))
+
+    do_zero = ArmazemVendas(tmp_path / "do_zero", tamanho_bloco=2)
+    do_zero.ingerir(_csv(LINHAS, quebra, final))
+
+    pd.testing.assert_frame_equal(_ordenado(incremental.carregar()), _ordenado(do_zero.carregar()))
+    # Só as linhas novas (DIA, EVA, GUI válidas) foram interpretadas nas duas últimas leituras
+    assert incremental.linhas_interpretadas - antes == 3
+    pd.testing.assert_frame_equal(incremental.quarentena, do_zero.quarentena)
+    assert incremental.quarentena[["LINHA", "REP."]].values.tolist() == [[3, "BIA"], [7, "FIA"]]
+
+
+def test_linha_antiga_alterada_reconstroi(tmp_path):
+    local = ArmazemVendas(tmp_path, tamanho_bloco=2)
+    local.ingerir(_csv(LINHAS[:4]))
+    alteradas = ["ANA,150,JAN,X,2023", *LINHAS[1:]]
+    local.ingerir(_csv(alteradas))
+
+    do_zero = ArmazemVendas(tmp_path / "do_zero")
+    do_zero.ingerir(_csv(alteradas))
+    pd.testing.assert_frame_equal(_ordenado(local.carregar()), _ordenado(do_zero.carregar()))
+    # 3 válidas no primeiro snapshot + as 5 válidas de novo, do zero
+    assert local.linhas_interpretadas == 3 + 5
+
+
+def test_linha_cortada_no_fim_nao_e_tratada_como_acrescimo(tmp_path):
+    local = ArmazemVendas(tmp_path)
+    local.ingerir(_csv(LINHAS[:3], final=False)[:-1])
+    local.ingerir(_csv(LINHAS[:3], final=False))
+    assert _ordenado(local.carregar())["SUBTOTAL"].tolist() == [100.0, 300.0]
+
+
+def test_snapshot_reaberto_continua_acrescentando(tmp_path):
+    ArmazemVendas(tmp_path).ingerir(_csv(LINHAS[:3]))
+    reaberto = ArmazemVendas(tmp_path)
+    reaberto.ingerir(_csv(LINHAS))
+    assert reaberto.linhas_interpretadas == 3
+    assert sorted(reaberto.carregar()["REP."].astype(str)) == ["ANA", "CAU", "DIA", "EVA", "GUI"]
+    assert reaberto.quarentena["LINHA"].tolist() == [3, 7]
+
+
+def test_muitos_acrescimos_sao_compactados(tmp_path, monkeypatch):
+    monkeypatch.setattr(armazem, "MAXIMO_PARTES", 2)
+    local = ArmazemVendas(tmp_path)
+    linhas = []
+    for i in range(6):
+        linhas.append(f"R{i},{i + 1}0,JAN,X,2024")
+        local.ingerir(_csv(linhas))
+    particao = tmp_path / "dados" / "ANO=2024"
+    assert len(list(particao.iterdir())) <= 2
+    assert sorted(local.carregar()["SUBTOTAL"].tolist()) == [10.0, 20.0, 30.0, 40.0, 50.0, 60.0]
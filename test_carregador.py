@@ -0,0 +1,163 @@
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pandas as pd
+import pytest
+
+from carregador import CarregadorPlanilha
+
+
+CSV_A = b"REP.,SUBTOTAL\nANA,10\n"
+CSV_B = b"REP.,SUBTOTAL\nANA,10\nBIA,20\n"
+
+
+# 🧪 Planilha falsa: devolve `corpo` com ETag opcional e responde 304 a requisições condicionais
+class Planilha:
+    def __init__(self):
+        self.corpo = CSV_A
+        self.etag = '"v1"'
+        self.status = 200
+        self.atraso = 0.0
+        self.condicionais = 0
+        self.respostas = []
+        self.url = None
+
+
+@pytest.fixture
+def planilha():
+    estado = Planilha()
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            time.sleep(estado.atraso)
+            if self.headers.get("If-None-Match"):
+                estado.condicionais += 1
+            if estado.status != 200:
+                estado.respostas.append(estado.status)
+                self.send_error(estado.status)
+                return
+            if estado.etag and self.headers.get("If-None-Match") == estado.etag:
+                estado.respostas.append(304)
+                self.send_response(304)
+                self.end_headers()
+                return
+            estado.respostas.append(200)
+            self.send_response(200)
+            if estado.etag:
+                self.send_header("ETag", estado.etag)
+            self.send_header("Content-Length", str(len(estado.corpo)))
+            self.end_headers()
+            self.wfile.write(estado.corpo)
+
+        def log_message(self, *args):
+            pass
+
+    servidor = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    thread = threading.Thread(target=servidor.serve_forever, daemon=True)
+    thread.start()
+    estado.url = f"http://127.0.0.1:{servidor.server_address[1]}/planilha.csv"
+    yield estado
+    servidor.shutdown()
+    servidor.server_close()
+
+
+def test_dentro_do_ttl_nao_vai_a_rede(planilha):
+    carregador = CarregadorPlanilha(planilha.url, ttl=300)
+    primeiro = carregador.obter()
+    assert carregador.obter() is primeiro
+    assert carregador.requisicoes == 1
+    assert primeiro.dados["REP."].tolist() == ["ANA"]
+
+
+def test_304_reaproveita_o_dataframe(planilha):
+    carregador = CarregadorPlanilha(planilha.url, ttl=0)
+    primeiro = carregador.obter()
+    segundo = carregador.obter()
+    assert planilha.respostas == [200, 304]
+    assert carregador.parses == 1
+    assert segundo.dados is primeiro.dados
+    assert segundo.verificado_em >= primeiro.verificado_em
+
+
+def test_mesmo_conteudo_sem_etag_nao_interpreta_de_novo(planilha):
+    planilha.etag = None
+    carregador = CarregadorPlanilha(planilha.url, ttl=0)
+    primeiro = carregador.obter()
+    segundo = carregador.obter()
+    assert planilha.respostas == [200, 200]
+    assert carregador.parses == 1
+    assert segundo.dados is primeiro.dados
+
+    planilha.corpo = CSV_B
+    terceiro = carregador.obter()
+    assert carregador.parses == 2
+    assert terceiro.dados["REP."].tolist() == ["ANA", "BIA"]
+
+
+def test_forcar_ignora_ttl_e_requisicao_condicional(planilha):
+    carregador = CarregadorPlanilha(planilha.url, ttl=300)
+    carregador.obter()
+    carregador.obter(forcar=True)
+    assert planilha.respostas == [200, 200]
+    assert planilha.condicionais == 0
+    assert carregador.parses == 2
+
+
+def test_stale_while_revalidate_serve_o_antigo_e_atualiza_em_segundo_plano(planilha):
+    carregador = CarregadorPlanilha(planilha.url, ttl=0)
+    primeiro = carregador.obter()
+    planilha.etag = '"v2"'
+    planilha.corpo = CSV_B
+
+    assert carregador.obter(stale_while_revalidate=True) is primeiro
+    carregador._atualizando.join(timeout=5)
+    assert carregador.snapshot.dados["REP."].tolist() == ["ANA", "BIA"]
+    assert carregador.ultimo_erro is None
+
+
+def test_falha_em_segundo_plano_fica_em_ultimo_erro(planilha):
+    carregador = CarregadorPlanilha(planilha.url, ttl=0)
+    primeiro = carregador.obter()
+    planilha.status = 500
+
+    assert carregador.obter(stale_while_revalidate=True) is primeiro
+    carregador._atualizando.join(timeout=5)
+    assert carregador.snapshot is primeiro
+    assert carregador.ultimo_erro is not None
+
+
+def test_erro_de_leitura_em_segundo_plano_fica_em_ultimo_erro(planilha):
+    def parser(arquivo):
+        dados = pd.read_csv(arquivo)
+        if "SUBTOTAL" not in dados.columns:
+            raise ValueError("coluna SUBTOTAL ausente")
+        return dados
+
+    carregador = CarregadorPlanilha(planilha.url, ttl=0, parser=parser)
+    primeiro = carregador.obter()
+    planilha.etag = '"v2"'
+    planilha.corpo = b"REP.,TOTAL\nANA,10\n"
+
+    assert carregador.obter(stale_while_revalidate=True) is primeiro
+    carregador._atualizando.join(timeout=5)
+    assert carregador.snapshot is primeiro
+    assert isinstance(carregador.ultimo_erro, ValueError)
+
+    with pytest.raises(ValueError):
+        carregador.obter()
+    assert isinstance(carregador.ultimo_erro, ValueError)
+
+
+def test_sessoes_simultaneas_fazem_uma_unica_requisicao(planilha):
+    planilha.atraso = 0.2
+    carregador = CarregadorPlanilha(planilha.url, ttl=300)
+    resultados = []
+    threads = [threading.Thread(target=lambda: resultados.append(carregador.obter())) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(timeout=10)
+    assert carregador.requisicoes == 1
+    assert len(resultados) == 8
+    assert all(snapshot is resultados[0] for snapshot in resultados)
@@ -0,0 +1,54 @@
+import io
+
+import pandas as pd
+import pytest
+
+from ingestao import ingerir, ler_em_blocos
+from normalizacao import limpar_valores, normalizar_vendas
+
+
+CSV_MISTO = (
+    "REP.,SUBTOTAL,MÊS,EMPRESA,ANO\n"
+    "A,1234.56,JANEIRO,X,2024\n"
+    "B,99.9,FEV,X,2024\n"
+    'C,"R$ 1.234,56",MAR,X,2024\n'
+    "D,abc,MAR,X,2024\n"
+)
+
+
+def test_subtotal_numerico_sem_formatacao_nao_perde_o_ponto_decimal():
+    blocos = list(ler_em_blocos(io.StringIO(CSV_MISTO), tamanho_bloco=2))
+    valores = pd.concat([bloco.vendas for bloco in blocos])["SUBTOTAL"].tolist()
+    assert valores == [1234.56, 99.9, 1234.56]
+    assert valores == normalizar_vendas(pd.read_csv(io.StringIO(CSV_MISTO)))["SUBTOTAL"].tolist()
+
+
+@pytest.mark.parametrize(
+    "texto, esperado",
+    [
+        ("1.234", 1234.0),
+        ("1.234.567", 1234567.0),
+        ("-1.234", -1234.0),
+        ("R$ 1.234,56", 1234.56),
+        ("12,5", 12.5),
+        ("1234.56", 1234.56),
+        ("99.9", 99.9),
+        ("1234", 1234.0),
+    ],
+)
+def test_ponto_em_grupos_de_tres_e_separador_de_milhar(texto, esperado):
+    assert limpar_valores(pd.Series([texto], dtype="object")).tolist() == [esperado]
+
+
+def test_milhar_com_pontos_nao_vai_para_a_quarentena():
+    csv = "REP.,SUBTOTAL,MÊS,EMPRESA,ANO\nA,1.234,JAN,X,2024\nB,1.234.567,FEV,X,2024\n"
+    resultado = ingerir(io.StringIO(csv))
+    assert resultado.quarentena.empty
+    assert resultado.cubo["SUBTOTAL"].sum() == pytest.approx(1234 + 1234567)
+
+
+def test_so_o_valor_ilegivel_vai_para_a_quarentena():
+    resultado = ingerir(io.StringIO(CSV_MISTO))
+    assert resultado.quarentena[["LINHA", "MOTIVO", "REP."]].values.tolist() == [[5, "valor inválido", "D"]]
+    assert resultado.linhas_validas == 3
+    assert resultado.cubo["SUBTOTAL"].sum() == pytest.approx(1234.56 + 99.9 + 1234.56)
@@ -0,0 +1,45 @@
+import pandas as pd
+
+from livro_pontos import LivroPontos
+
+
+def _base(*linhas):
+    return pd.DataFrame(linhas, columns=["REP.", "MÊS", "AÇÃO", "PROMOÇÃO", "INADIMPLÊNCIA"])
+
+
+def test_desfazer_vale_ao_reabrir_antes_de_carregar_a_base(tmp_path):
+    caminho = tmp_path / "livro.db"
+    livro = LivroPontos(caminho)
+    livro.definir_base("v1", _base(("A", "JANEIRO", 4, 0, 1)))
+    livro.incluir("A", "JANEIRO", acao=2)
+    livro.desfazer("A", "JANEIRO")
+    assert livro.consultar("A", "JANEIRO") == (0, 0, 0)
+
+    reaberto = LivroPontos(caminho)
+    assert reaberto.consultar("A", "JANEIRO") == (0, 0, 0)
+    reaberto.definir_base("v1", _base(("A", "JANEIRO", 4, 0, 1)))
+    assert reaberto.consultar("A", "JANEIRO") == (0, 0, 0)
+    assert reaberto.materializar().empty
+
+
+def test_desfazer_nao_fica_negativo_quando_a_planilha_muda(tmp_path):
+    livro = LivroPontos(tmp_path / "livro.db")
+    livro.definir_base("v1", _base(("A", "JANEIRO", 4, 0, 1), ("B", "JANEIRO", 3, 0, 0)))
+    livro.desfazer("A", "JANEIRO")
+    livro.definir_base("v2", _base(("B", "JANEIRO", 3, 0, 0)))
+    assert livro.consultar("A", "JANEIRO") == (0, 0, 0)
+    livro.definir_base("v3", _base(("A", "JANEIRO", 9, 9, 9), ("B", "JANEIRO", 3, 0, 0)))
+    assert livro.consultar("A", "JANEIRO") == (0, 0, 0)
+    assert livro.consultar("B", "JANEIRO") == (3, 0, 0)
+
+
+def test_lancamentos_depois_do_desfazer_continuam_somando(tmp_path):
+    livro = LivroPontos(tmp_path / "livro.db")
+    livro.definir_base("v1", _base(("A", "JANEIRO", 4, 0, 1)))
+    livro.incluir("A", "JANEIRO", promocao=5)
+    livro.desfazer("A", "JANEIRO")
+    livro.incluir("A", "JANEIRO", acao=1)
+    livro.incluir("A", "JANEIRO", inadimplencia=2)
+    assert livro.consultar("A", "JANEIRO") == (1, 0, 2)
+    assert LivroPontos(tmp_path / "livro.db").consultar("A", "JANEIRO") == (1, 0, 2)
+    assert livro.historico()["TIPO"].tolist() == ["inclusao", "desfazer", "inclusao", "inclusao"]
@@ -0,0 +1,19 @@
+import subprocess
+import sys
+
+from cubo import construir_cubo
+from motor_ranking import TODOS_OS_MESES, classificar_tudo
+from normalizacao import MESES, normalizar_pontos, normalizar_vendas
+from sinteticos import gerar_pontos, gerar_vendas
+
+
+def test_motor_roda_sem_streamlit():
+    codigo = "import sys, motor_ranking; sys.exit('streamlit' in sys.modules)"
+    assert subprocess.run([sys.executable, "-c", codigo]).returncode == 0
+
+
+def test_meses_em_ordem_cronologica_com_o_ano_inteiro_por_ultimo():
+    vendas = normalizar_vendas(gerar_vendas(5_000, anos=(2024,), empresas=("ALFA",)))
+    tudo = classificar_tudo(construir_cubo(vendas), normalizar_pontos(gerar_pontos(200)))
+    for _, meses in tudo.groupby(["ANO", "EMPRESA"])["MÊS"]:
+        assert list(dict.fromkeys(meses)) == [*MESES, TODOS_OS_MESES]
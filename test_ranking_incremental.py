@@ -0,0 +1,69 @@
+import random
+
+import pandas as pd
+import pytest
+
+from ranking_incremental import LIMITE_INCREMENTAL, RankingIncremental, diferenca, movimentos_entre
+
+
+def _novo(vendas, extras, ausentes):
+    return RankingIncremental(vendas, extras, sum(vendas.values()) + 10.0, ausentes)
+
+
+def _conferir(incremental, vendas, extras, ausentes):
+    pd.testing.assert_frame_equal(incremental.tabela(), _novo(vendas, extras, ausentes).tabela())
+
+
+@pytest.mark.parametrize("ausentes", ["descartar", "incluir"])
+@pytest.mark.parametrize("semente", range(3))
+def test_atualizacoes_aleatorias_iguais_a_reconstruir(ausentes, semente):
+    sorteio = random.Random(semente)
+    reps = [f"REP {i:02d}" for i in range(40)]
+    vendas = {rep: float(sorteio.randint(1, 400_000)) for rep in reps[:30]}
+    extras = {rep: (sorteio.randint(0, 5), 0, sorteio.randint(0, 2)) for rep in sorteio.sample(reps, 12)}
+    incremental = _novo(vendas, extras, ausentes)
+
+    for _ in range(150):
+        rep = sorteio.choice(reps)
+        antes = _novo(vendas, extras, ausentes)._foto()
+        if sorteio.random() < 0.6:
+            # Valor novo, saída do ranking (0) ou entrada de quem não vendia
+            valor = 0.0 if sorteio.random() < 0.25 else float(sorteio.randint(1, 400_000))
+            movimentos = incremental.atualizar_venda(rep, valor)
+            if valor > 0:
+                vendas[rep] = valor
+            else:
+                vendas.pop(rep, None)
+        else:
+            valores = None if sorteio.random() < 0.3 else (sorteio.randint(0, 5), sorteio.randint(0, 3), 1)
+            movimentos = incremental.atualizar_pontos(rep, valores)
+            if valores is None:
+                extras.pop(rep, None)
+            else:
+                extras[rep] = valores
+        # O total de vendas sem REP. não muda nessas atualizações
+        incremental._fora_do_ranking = 10.0
+        _conferir(incremental, vendas, extras, ausentes)
+        assert movimentos == diferenca(antes, _novo(vendas, extras, ausentes)._foto())
+
+
+@pytest.mark.parametrize("ausentes", ["descartar", "incluir"])
+@pytest.mark.parametrize("mudancas", [3, LIMITE_INCREMENTAL + 1, 400])
+def test_sincronizar_vendas_igual_a_reconstruir(ausentes, mudancas):
+    sorteio = random.Random(mudancas)
+    vendas = {f"REP {i:03d}": float(sorteio.randint(1, 400_000)) for i in range(500)}
+    extras = {f"REP {i:03d}": (1, 0, 0) for i in range(0, 520, 7)}
+    incremental = _novo(vendas, extras, ausentes)
+    antes = incremental.tabela()
+
+    novas = dict(vendas)
+    for rep in sorteio.sample(sorted(vendas), mudancas):
+        if sorteio.random() < 0.1:
+            del novas[rep]
+        else:
+            novas[rep] = float(sorteio.randint(1, 400_000))
+    novas["REP 999"] = 123_456.0
+
+    movimentos = incremental.sincronizar_vendas(novas, sum(novas.values()) + 10.0)
+    _conferir(incremental, novas, extras, ausentes)
+    assert movimentos == movimentos_entre(antes, incremental.tabela())
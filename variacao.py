@@ -0,0 +1,83 @@
+from dataclasses import dataclass
+
+import pandas as pd
+
+from normalizacao import ABREVIACOES, abreviar_meses
+
+
+# 📐 Variação percentual de `comparado` sobre `base` (base zero conta como 1, como sempre foi no app)
+def variacao_percentual(base, comparado):
+    return (comparado - base) / base.replace(0, 1) * 100
+
+
+# 🗂️ Vendas por MÊS × ANO, por REP. × ANO e total por ANO, montadas uma vez por snapshot (NaN = sem venda naquele ano)
+@dataclass(frozen=True)
+class PainelVariacao:
+    meses: pd.DataFrame
+    reps: pd.DataFrame
+    totais: pd.Series
+
+    @property
+    def anos(self):
+        return self.totais.index.tolist()
+
+    def _par(self, tabela, ano_base, ano_comparado):
+        base, comparado = str(ano_base), str(ano_comparado)
+        par = tabela.reindex(columns=[ano_base, ano_comparado]).dropna(how="all").fillna(0)
+        par.columns = [base, comparado]
+        return par, base, comparado
+
+    # 📈 Comparativo mês a mês entre dois anos, com TOTAL GERAL por mês, variação (%) e linha de total
+    def comparar_meses(self, ano_base, ano_comparado):
+        comparativo, base, comparado = self._par(self.meses, ano_base, ano_comparado)
+        comparativo = comparativo.reindex(ABREVIACOES)
+
+        comparativo["TOTAL GERAL"] = comparativo[base] + comparativo[comparado]
+        comparativo["VARIAÇÃO (%)"] = variacao_percentual(comparativo[base], comparativo[comparado])
+
+        soma_base = comparativo[base].sum()
+        soma_comparado = comparativo[comparado].sum()
+        linha_total = comparativo.sum(numeric_only=True).to_frame("TOTAL GERAL").T
+        linha_total["VARIAÇÃO (%)"] = (soma_comparado - soma_base) / (soma_base if soma_base != 0 else 1) * 100
+        return pd.concat([comparativo, linha_total])
+
+    # 👥 Vendas de cada representante nos dois anos e a variação (%) entre eles
+    def comparar_reps(self, ano_base, ano_comparado):
+        comparativo, base, comparado = self._par(self.reps, ano_base, ano_comparado)
+        comparativo["VARIAÇÃO (%)"] = variacao_percentual(comparativo[base], comparativo[comparado])
+        return comparativo
+
+    # 📉 Série anual: total vendido por ano e variação (%) contra o ano anterior
+    def serie_anual(self):
+        totais = self.totais
+        serie = pd.DataFrame({
+            "TOTAL": totais,
+            "VARIAÇÃO (%)": variacao_percentual(totais.shift(1), totais),
+        })
+        serie.index = serie.index.astype(str)
+        serie.index.name = "ANO"
+        return serie
+
+    # 🗓️ Vendas por mês com uma coluna por ano (base das linhas de tendência)
+    def tendencia_mensal(self):
+        tendencia = self.meses.reindex(ABREVIACOES)
+        tendencia.columns = tendencia.columns.astype(str)
+        return tendencia
+
+
+# 🧮 Uma passada agrupada sobre o cubo para todos os anos de uma vez
+def construir_painel(cubo):
+    meses = (
+        cubo.groupby([abreviar_meses(cubo["MÊS"]), "ANO"], observed=True)["SUBTOTAL"]
+        .sum()
+        .unstack("ANO")
+    )
+    meses.index = meses.index.astype(str)
+    reps = cubo.groupby(["REP.", "ANO"], observed=True)["SUBTOTAL"].sum().unstack("ANO")
+    reps.index = reps.index.astype(str)
+    for tabela in (meses, reps):
+        tabela.columns = tabela.columns.astype(int)
+        tabela.columns.name = None
+    totais = cubo.groupby("ANO")["SUBTOTAL"].sum()
+    totais.index = totais.index.astype(int)
+    return PainelVariacao(meses=meses, reps=reps, totais=totais)